@@ -1,69 +1,168 @@
 #!/usr/bin/env python3
 """Browser management for Playwright-based scraping."""
 import asyncio
-from playwright.async_api import async_playwright, Page, Browser, Response
-from typing import Optional
+import logging
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Response, Route
+from typing import FrozenSet, Optional
+
+log = logging.getLogger(__name__)
+
+# Resource types the scrapers never look at; aborting them skips the downloads
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+# Chromium HTTP cache size for a persistent profile (100 MB)
+DISK_CACHE_SIZE = 100 * 1024 * 1024
 
 
 class BrowserManager:
     """Manages browser lifecycle and page operations."""
     
-    def __init__(self, headless: bool = True, timeout: int = 30000):
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 30000,
+        block_resources: bool = True,
+        blocked_resource_types: FrozenSet[str] = BLOCKED_RESOURCE_TYPES,
+        user_data_dir: Optional[str] = None
+    ):
         """
         Initialize browser manager.
         
         Args:
             headless: Whether to run browser in headless mode
             timeout: Default timeout for page operations in milliseconds
+            block_resources: Whether to abort requests for blocked_resource_types
+            blocked_resource_types: Playwright resource types to abort
+                (image/font/media/stylesheet by default)
+            user_data_dir: Browser profile directory kept between runs, so
+                the HTTP cache and cookies survive a restart. The profile is
+                a single persistent context: new_context() is unavailable
         """
         self.headless = headless
         self.timeout = timeout
+        self.block_resources = block_resources
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.user_data_dir = user_data_dir
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self._playwright = None
     
     async def start(self):
         """Initialize browser and page."""
         self._playwright = await async_playwright().start()
-        self.browser = await self._playwright.chromium.launch(headless=self.headless)
-        self.page = await self.browser.new_page()
-        print(f"Browser started (headless={self.headless})")
+        if self.user_data_dir:
+            # A warm profile: scripts and pages cached by earlier runs are
+            # served from disk instead of being downloaded again
+            self.context = await self._playwright.chromium.launch_persistent_context(
+                self.user_data_dir,
+                headless=self.headless,
+                args=[f"--disk-cache-size={DISK_CACHE_SIZE}"]
+            )
+            if self.block_resources:
+                await self.context.route("**/*", self._block_resource)
+            # The profile opens with a blank page already
+            self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        else:
+            self.browser = await self._playwright.chromium.launch(headless=self.headless)
+            # One context for the whole session, so the route and cache are shared
+            self.context = await self.new_context()
+            self.page = await self.context.new_page()
+        log.info("Browser started (headless=%s)", self.headless)
+    
+    async def _block_resource(self, route: Route):
+        """Abort requests for resources the DOM scrapers don't need."""
+        if route.request.resource_type in self.blocked_resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def new_context(self) -> BrowserContext:
+        """
+        Open an extra context in the running browser, with resource
+        blocking set up like the main one. Much cheaper than a second
+        browser, and its cookies, cache and memory are its own: closing it
+        frees everything its pages held. The caller closes it.
+        
+        Returns:
+            New browser context
+        """
+        if not self.browser:
+            if self.user_data_dir:
+                raise RuntimeError("A persistent profile has a single context; use new_page().")
+            raise RuntimeError("Browser not started. Call start() first.")
+        context = await self.browser.new_context()
+        if self.block_resources:
+            await context.route("**/*", self._block_resource)
+        return context
+    
+    async def new_page(self) -> Page:
+        """
+        Open another page in the shared context, for work that needs its own
+        page state (e.g. concurrent form submissions). Resource blocking
+        applies to it as well. The caller closes it.
+        
+        Returns:
+            New page object
+        """
+        if not self.context:
+            raise RuntimeError("Browser not started. Call start() first.")
+        return await self.context.new_page()
     
     async def close(self):
         """Close browser and cleanup."""
         if self.browser:
             await self.browser.close()
+        elif self.context:
+            # Persistent profile: closing its context closes the browser
+            await self.context.close()
         if self._playwright:
             await self._playwright.stop()
-        print("Browser closed")
+        log.info("Browser closed")
     
-    async def navigate(self, url: str) -> Optional[Response]:
+    async def navigate(
+        self,
+        url: str,
+        wait_until: str = "domcontentloaded",
+        page: Optional[Page] = None
+    ) -> Optional[Response]:
         """
         Navigate to a URL.
         
         Args:
             url: URL to navigate to
+            wait_until: Load state to wait for; pass "networkidle" for pages
+                whose content is rendered by scripts after DOMContentLoaded
+            page: Page to navigate (uses the main page if None)
             
         Returns:
             Response object or None
         """
-        if not self.page:
+        page = page or self.page
+        if not page:
             raise RuntimeError("Browser not started. Call start() first.")
         
-        return await self.page.goto(url, wait_until="networkidle", timeout=self.timeout)
+        return await page.goto(url, wait_until=wait_until, timeout=self.timeout)
     
-    async def wait_for_selector(self, selector: str, timeout: Optional[int] = None):
+    async def wait_for_selector(
+        self,
+        selector: str,
+        timeout: Optional[int] = None,
+        page: Optional[Page] = None
+    ):
         """
         Wait for a selector to appear on the page.
         
         Args:
             selector: CSS selector to wait for
             timeout: Timeout in milliseconds (uses default if None)
+            page: Page to wait on (uses the main page if None)
         """
-        if not self.page:
+        page = page or self.page
+        if not page:
             raise RuntimeError("Browser not started. Call start() first.")
         
-        await self.page.wait_for_selector(selector, timeout=timeout or self.timeout)
+        await page.wait_for_selector(selector, timeout=timeout or self.timeout)
     
     async def query_selector(self, selector: str):
         """Query for a single element."""
@@ -77,18 +176,25 @@ class BrowserManager:
             raise RuntimeError("Browser not started. Call start() first.")
         return await self.page.query_selector_all(selector)
     
-    async def scroll_to_bottom(self, pause_time: float = 1.0, max_scrolls: int = 10):
+    async def scroll_to_bottom(
+        self,
+        pause_time: float = 1.0,
+        max_scrolls: int = 10,
+        page: Optional[Page] = None
+    ):
         """
         Scroll to bottom of page to load dynamic content.
         
         Args:
             pause_time: Time to wait between scrolls in seconds
             max_scrolls: Maximum number of scroll attempts
+            page: Page to scroll (uses the main page if None)
             
         Returns:
             Number of scrolls performed
         """
-        if not self.page:
+        page = page or self.page
+        if not page:
             raise RuntimeError("Browser not started. Call start() first.")
         
         previous_height = 0
@@ -96,14 +202,14 @@ class BrowserManager:
         
         for i in range(max_scrolls):
             # Get current scroll height
-            current_height = await self.page.evaluate("document.body.scrollHeight")
+            current_height = await page.evaluate("document.body.scrollHeight")
             
             # If height hasn't changed, we've reached the bottom
             if current_height == previous_height:
                 break
             
             # Scroll to bottom
-            await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             
             # Wait for content to load
             await asyncio.sleep(pause_time)
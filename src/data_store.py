@@ -1,8 +1,73 @@
 #!/usr/bin/env python3
 """Data storage utilities for scraped quotes."""
 import json
+import logging
 import os
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    import orjson
+except ImportError:  # Fall back to the (slower) stdlib encoder
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+
+def _dumps_line(item: Dict) -> bytes:
+    """Encode one item as a line of NDJSON."""
+    if orjson is not None:
+        return orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(item, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+class JsonLinesWriter:
+    """
+    Writes items to an NDJSON file (one JSON object per line) as they
+    arrive. Each call encodes only the new items and flushes them, so a
+    long scrape never re-serializes what it already saved and a crash
+    loses at most the batch in progress. Use via DataStore.open_stream.
+    """
+    
+    def __init__(self, filepath: str, append: bool = True):
+        """
+        Open the output file.
+        
+        Args:
+            filepath: Path of the NDJSON file
+            append: Add to an existing file instead of truncating it
+        """
+        self.filepath = filepath
+        self.count = 0  # Items written through this writer
+        self._file = open(filepath, 'ab' if append else 'wb')
+    
+    def write(self, item: Dict):
+        """Append a single item."""
+        self.write_many((item,))
+    
+    def write_many(self, items: Iterable[Dict]):
+        """
+        Append a batch of items with a single write.
+        
+        Args:
+            items: Dictionaries to append
+        """
+        lines = [_dumps_line(item) for item in items]
+        if lines:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self.count += len(lines)
+    
+    def close(self):
+        """Close the file."""
+        if not self._file.closed:
+            self._file.close()
+            log.info("Streamed %d items to %s", self.count, self.filepath)
+    
+    def __enter__(self) -> 'JsonLinesWriter':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 class DataStore:
@@ -28,10 +93,15 @@ class DataStore:
         """
         filepath = os.path.join(self.output_dir, filename)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # orjson encodes straight to UTF-8 bytes, no text-mode layer
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         
-        print(f"\nSaved {len(data)} items to {filepath}")
+        log.info("Saved %d items to %s", len(data), filepath)
     
     def load_from_json(self, filename: str) -> List[Dict]:
         """
@@ -45,11 +115,44 @@ class DataStore:
         """
         filepath = os.path.join(self.output_dir, filename)
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         return data
     
+    def open_stream(self, filename: str, append: bool = True) -> JsonLinesWriter:
+        """
+        Open an NDJSON file in the output directory for incremental writes.
+        
+        Args:
+            filename: Output filename (conventionally *.jsonl)
+            append: Add to an existing file instead of truncating it
+            
+        Returns:
+            Writer to use as a context manager
+        """
+        return JsonLinesWriter(os.path.join(self.output_dir, filename), append=append)
+    
+    def load_stream(self, filename: str) -> Iterator[Dict]:
+        """
+        Read an NDJSON file written by open_stream, one item at a time.
+        
+        Args:
+            filename: Input filename
+            
+        Yields:
+            One dictionary per non-empty line
+        """
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(os.path.join(self.output_dir, filename), 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+    
     @staticmethod
     def get_unique_values(data: List[Dict], key: str) -> List[str]:
         """
@@ -62,14 +165,16 @@ class DataStore:
         Returns:
             Sorted list of unique values
         """
-        values = set()
-        for item in data:
-            value = item.get(key)
-            if isinstance(value, list):
-                values.update(value)
-            elif value:
-                values.add(value)
-        return sorted(values)
+        def iter_values():
+            for item in data:
+                value = item.get(key)
+                if isinstance(value, (list, tuple)):
+                    yield from value
+                elif value:
+                    yield value
+        
+        # Let set() drain the generator in one call instead of add/update per item
+        return sorted(set(iter_values()))
     
     @staticmethod
     def get_authors(quotes: List[Dict]) -> List[str]:
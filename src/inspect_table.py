@@ -7,40 +7,45 @@ async def inspect():
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
-        await page.goto('https://quotes.toscrape.com/search.aspx')
-        await page.wait_for_timeout(2000)
+        # The form is server-rendered, so it is in the DOM once
+        # DOMContentLoaded fires; a missing select is reported below
+        await page.goto('https://quotes.toscrape.com/search.aspx', wait_until='domcontentloaded')
+        
+        # Read both selects and the submit button in one evaluate instead of
+        # a query plus two evaluates per select
+        form = await page.evaluate('''
+            () => {
+                const describe = id => {
+                    const el = document.getElementById(id);
+                    if (!el) return null;
+                    return {
+                        count: el.options.length,
+                        sample: Array.from(el.options).slice(0, 5).map(opt => ({value: opt.value, text: opt.text}))
+                    };
+                };
+                const submit = document.querySelector('input[type="submit"]');
+                return {author: describe('author'), tag: describe('tag'), submit: submit ? submit.value : null};
+            }
+        ''')
         
         # Get form structure
         print("Form selects:")
-        author_select = await page.query_selector('select#author')
-        tag_select = await page.query_selector('select#tag')
+        author_select = form['author']
+        tag_select = form['tag']
         
         if author_select:
-            author_count = await author_select.evaluate('(el) => el.options.length')
-            print(f"Author select: {author_count} options")
-            
-            # Get first few author options
-            authors = await author_select.evaluate('''
-                (el) => Array.from(el.options).slice(0, 5).map(opt => ({value: opt.value, text: opt.text}))
-            ''')
-            print(f"Sample authors: {authors}")
+            print(f"Author select: {author_select['count']} options")
+            print(f"Sample authors: {author_select['sample']}")
         
         if tag_select:
-            tag_count = await tag_select.evaluate('(el) => el.options.length')
-            print(f"\nTag select: {tag_count} options")
-            
-            # Get first few tag options
-            tags = await tag_select.evaluate('''
-                (el) => Array.from(el.options).slice(0, 5).map(opt => ({value: opt.value, text: opt.text}))
-            ''')
-            print(f"Sample tags: {tags}")
+            print(f"\nTag select: {tag_select['count']} options")
+            print(f"Sample tags: {tag_select['sample']}")
         
         # Check if there's a submit button
-        submit_btn = await page.query_selector('input[type="submit"]')
-        if submit_btn:
-            value = await submit_btn.get_attribute('value')
-            print(f"\nSubmit button found: {value}")
+        if form['submit'] is not None:
+            print(f"\nSubmit button found: {form['submit']}")
         
+        # Leave the headful window up long enough to look at the form
         await page.wait_for_timeout(5000)
         await browser.close()
 
@@ -1,7 +1,51 @@
 #!/usr/bin/env python3
 """HTML parsing and data extraction for quotes."""
-from typing import List, Dict, Optional
-from playwright.async_api import ElementHandle
+import asyncio
+import hashlib
+from typing import List, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+from playwright.async_api import ElementHandle, Page
+
+
+# Runs in the browser: extracts every matched quote element in a single
+# round trip. Handles both the standard markup and the table-based layout
+# used when the text selector is None
+_EXTRACT_QUOTES_JS = """
+(elements, selectors) => elements.map(el => {
+    if (selectors.text == null) {
+        // Table-based layout: "Quote text Author: Name", tags in the next row
+        const parts = el.innerText.split(' Author: ');
+        const [text, author] = parts.length === 2 ? parts.map(p => p.trim()) : ['', ''];
+        const nextRow = el.parentElement && el.parentElement.nextElementSibling;
+        const tagCell = nextRow && nextRow.querySelector('td');
+        const tags = tagCell ? Array.from(tagCell.querySelectorAll('a'), a => a.innerText.trim()) : [];
+        return {text, author, tags};
+    }
+    
+    const text = el.querySelector(selectors.text);
+    const author = el.querySelector(selectors.author);
+    return {
+        text: text ? text.innerText : '',
+        author: author ? author.innerText : '',
+        tags: Array.from(el.querySelectorAll(selectors.tags), t => t.innerText)
+    };
+})
+"""
+
+# The same extraction for a single element handle
+_EXTRACT_QUOTE_JS = f"(el, selectors) => ({_EXTRACT_QUOTES_JS})([el], selectors)[0]"
+
+# A whole listing page in one round trip: every quote plus the raw href of
+# the "next" pagination link (null on the last page)
+_PARSE_PAGE_JS = f"""
+([quoteSelector, selectors]) => {{
+    const next = document.querySelector('li.next > a');
+    return {{
+        quotes: ({_EXTRACT_QUOTES_JS})(Array.from(document.querySelectorAll(quoteSelector)), selectors),
+        next: next ? next.getAttribute('href') : null
+    }};
+}}
+"""
 
 
 class QuoteParser:
@@ -33,83 +77,119 @@ class QuoteParser:
         Returns:
             Dictionary with quote data
         """
-        # Check if we're using custom table-based parsing
-        text_selector = self.selectors.get('text')
+        # Same extraction as parse_quotes_bulk, for one element: a single
+        # evaluate instead of a query/inner_text round trip per field and tag
+        return await quote_elem.evaluate(_EXTRACT_QUOTE_JS, self.selectors)
+    
+    @staticmethod
+    def fingerprint(quote: Dict) -> bytes:
+        """Get a compact 8-byte identity for a quote (text + author)."""
+        key = f"{quote['text']}|{quote['author']}".encode()
+        return hashlib.blake2b(key, digest_size=8).digest()
+    
+    @classmethod
+    def drop_seen(cls, quotes: List[Dict], seen: Set[bytes]) -> List[Dict]:
+        """
+        Filter out quotes whose fingerprint is already in `seen`.
         
-        if text_selector is None:
-            # Table-based layout: parse from plain text
-            full_text = await quote_elem.inner_text()
-            
-            # Extract quote and author from format: "Quote text" Author: Name
-            text = ""
-            author = ""
-            
-            # Split by "Author:" to separate quote and author
-            if 'Author:' in full_text:
-                parts = full_text.split(' Author: ')
-                if len(parts) == 2:
-                    text = parts[0].strip()
-                    author = parts[1].strip()
-            
-            # Extract tags from next sibling row
-            tags = []
-            try:
-                parent_row = await quote_elem.evaluate_handle('(el) => el.parentElement')
-                if parent_row:
-                    next_row = await parent_row.evaluate_handle('(el) => el.nextElementSibling')
-                    if next_row:
-                        tag_cell = await next_row.query_selector('td')
-                        if tag_cell:
-                            tag_links = await tag_cell.query_selector_all('a')
-                            for tag_link in tag_links:
-                                tag_text = await tag_link.inner_text()
-                                tags.append(tag_text.strip())
-            except Exception as e:
-                pass
+        Args:
+            quotes: Parsed quote dictionaries
+            seen: Fingerprints of quotes kept so far (updated in place)
             
-            return {
-                'text': text,
-                'author': author,
-                'tags': tags
-            }
-        
-        # Standard parsing with CSS selectors
-        # Extract quote text
-        text_elem = await quote_elem.query_selector(self.selectors['text'])
-        text = await text_elem.inner_text() if text_elem else ""
-        
-        # Extract author
-        author_elem = await quote_elem.query_selector(self.selectors['author'])
-        author = await author_elem.inner_text() if author_elem else ""
-        
-        # Extract tags
-        tag_elements = await quote_elem.query_selector_all(self.selectors['tags'])
-        tags = []
-        for tag_elem in tag_elements:
-            tag_text = await tag_elem.inner_text()
-            tags.append(tag_text)
-        
-        return {
-            'text': text,
-            'author': author,
-            'tags': tags
-        }
+        Returns:
+            Quotes not seen before, in page order
+        """
+        fresh = []
+        for quote in quotes:
+            fp = cls.fingerprint(quote)
+            if fp not in seen:
+                seen.add(fp)
+                fresh.append(quote)
+        return fresh
     
-    async def parse_quotes(self, quote_elements: List[ElementHandle]) -> List[Dict]:
+    async def parse_quotes(
+        self,
+        quote_elements: List[ElementHandle],
+        seen: Optional[Set[bytes]] = None
+    ) -> List[Dict]:
         """
         Parse multiple quote elements.
         
         Args:
             quote_elements: List of quote element handles
+            seen: Fingerprints of quotes already collected; duplicates are skipped
             
         Returns:
             List of quote dictionaries
         """
-        quotes = []
-        for quote_elem in quote_elements:
-            quote = await self.parse_quote(quote_elem)
-            quotes.append(quote)
-        return quotes
+        # Overlap the per-element round trips; gather keeps the input order
+        quotes = await asyncio.gather(*(self.parse_quote(e) for e in quote_elements))
+        return list(quotes) if seen is None else self.drop_seen(quotes, seen)
+    
+    async def parse_quotes_bulk(
+        self,
+        page: Page,
+        quote_selector: str = '.quote',
+        seen: Optional[Set[bytes]] = None
+    ) -> List[Dict]:
+        """
+        Parse every quote on the page in a single browser round trip.
+        parse_quotes awaits several queries per quote element; this runs
+        the whole extraction inside the page instead.
+        
+        Args:
+            page: Playwright page object
+            quote_selector: CSS selector matching each quote element
+            seen: Fingerprints of quotes already collected; duplicates are skipped
+            
+        Returns:
+            List of quote dictionaries
+        """
+        quotes = await page.eval_on_selector_all(quote_selector, _EXTRACT_QUOTES_JS, self.selectors)
+        return quotes if seen is None else self.drop_seen(quotes, seen)
+    
+    async def parse_page(
+        self,
+        page: Page,
+        base_url: str,
+        quote_selector: str = '.quote',
+        seen: Optional[Set[bytes]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Parse a listing page's quotes and its next-page link together, in a
+        single evaluate: parse_quotes_bulk followed by extract_next_page_url
+        costs three round trips.
+        
+        Args:
+            page: Playwright page object
+            base_url: Base URL for constructing absolute URLs
+            quote_selector: CSS selector matching each quote element
+            seen: Fingerprints of quotes already collected; duplicates are skipped
+            
+        Returns:
+            Tuple of (quotes list, next page URL or None)
+        """
+        result = await page.evaluate(_PARSE_PAGE_JS, [quote_selector, self.selectors])
+        quotes = result['quotes']
+        if seen is not None:
+            quotes = self.drop_seen(quotes, seen)
+        return quotes, self._resolve_href(result['next'], base_url)
+    
+    @staticmethod
+    def _resolve_href(href: Optional[str], base_url: str) -> Optional[str]:
+        """Turn a pagination link's href into an absolute URL."""
+        if not href:
+            return None
+        # Handle both relative and absolute URLs
+        if href.startswith('http'):
+            return href
+        elif href.startswith('/'):
+            # Extract domain from base_url for absolute paths
+            parsed = urlparse(base_url)
+            return f"{parsed.scheme}://{parsed.netloc}{href}"
+        else:
+            # Relative path - append to current page URL
+            return base_url.rstrip('/') + '/' + href
     
     async def extract_next_page_url(self, page, base_url: str) -> Optional[str]:
         """
@@ -124,17 +204,5 @@ class QuoteParser:
         """
         next_button = await page.query_selector('li.next > a')
         if next_button:
-            href = await next_button.get_attribute('href')
-            if href:
-                # Handle both relative and absolute URLs
-                if href.startswith('http'):
-                    return href
-                elif href.startswith('/'):
-                    # Extract domain from base_url for absolute paths
-                    from urllib.parse import urlparse
-                    parsed = urlparse(base_url)
-                    return f"{parsed.scheme}://{parsed.netloc}{href}"
-                else:
-                    # Relative path - append to current page URL
-                    return base_url.rstrip('/') + '/' + href
+            return self._resolve_href(await next_button.get_attribute('href'), base_url)
         return None
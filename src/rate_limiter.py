@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Adaptive per-host request pacing for the scrapers."""
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces requests per host at a rate that follows the server's answers:
+    every successful response nudges the rate up a little, every 429/503
+    halves it (additive-increase/multiplicative-decrease style). A fast
+    server is no longer throttled by a fixed delay, and a rate-limited one
+    is backed off before it has to refuse more requests.
+    """
+    
+    def __init__(
+        self,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.1,
+        max_rate: float = 10.0,
+        increase: float = 1.05,
+        decrease: float = 0.5
+    ):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            initial_rate: Requests per second allowed to a host at first
+            min_rate: Lowest rate a host is slowed down to
+            max_rate: Highest rate a host is sped up to
+            increase: Factor applied to the rate after a successful response
+            decrease: Factor applied to the rate after a 429 or 503
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, initial_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self._rates: Dict[str, float] = {}      # Host -> current requests/second
+        self._next_slot: Dict[str, float] = {}  # Host -> earliest time of its next request
+    
+    async def acquire(self, url: str):
+        """
+        Wait for the URL's host to accept another request.
+        Each caller reserves the next free slot and sleeps only until it,
+        so concurrent callers are spaced out rather than all woken at once.
+        
+        Args:
+            url: URL about to be requested
+        """
+        host = urlsplit(url).netloc
+        rate = self._rates.setdefault(host, self.initial_rate)
+        
+        # No await between reading and advancing the slot, so concurrent
+        # tasks can't claim the same one
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + 1.0 / rate
+        
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    def record(self, url: str, status: int):
+        """
+        Adjust the host's rate after a response.
+        
+        Args:
+            url: URL that was requested
+            status: HTTP status code of the response
+        """
+        host = urlsplit(url).netloc
+        rate = self._rates.get(host, self.initial_rate)
+        
+        if status in (429, 503):
+            self._rates[host] = max(self.min_rate, rate * self.decrease)
+        elif status < 400:
+            self._rates[host] = min(self.max_rate, rate * self.increase)
@@ -1,96 +1,281 @@
 #!/usr/bin/env python3
 """HTTP response and error handling utilities."""
 import asyncio
-from playwright.async_api import Response
-from typing import Optional, Callable, TypeVar, Any
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from playwright.async_api import Response, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from typing import Optional, Callable, TypeVar, Any, Dict, NamedTuple, Tuple, Type
 
 T = TypeVar('T')
 
+log = logging.getLogger(__name__)
+
+# Transient failures worth retrying. Anything else (a closed page or
+# browser, a bug in the callee) fails the same way on every attempt
+RECOVERABLE: Tuple[Type[BaseException], ...] = (
+    PlaywrightTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+# Chromium reports network failures (refused/reset connections, DNS
+# lookups that fail) as a plain playwright Error whose message starts
+# with the net error name, e.g. "net::ERR_CONNECTION_REFUSED at <url>"
+NET_ERROR_MARKER = "net::ERR_"
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+    
+    Args:
+        value: Either delay-seconds ("120") or an HTTP-date
+        
+    Returns:
+        Seconds to wait (never negative), or None if the value is malformed
+    """
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HandlerResult(NamedTuple):
+    """
+    What handle_response decided about a response. The caller drives the
+    retry loop: it sleeps for retry_after and navigates again.
+    """
+    ok: bool  # True if the page can be used as is
+    retry_after: Optional[float] = None  # Seconds to wait before retrying; None = don't retry
+
+
+OK = HandlerResult(True)
+FAIL = HandlerResult(False)
+
+
+class HostBreaker:
+    """
+    Per-host circuit breaker. After `threshold` consecutive failures
+    (errors, no response, 5xx) a host is skipped for `cooldown` seconds,
+    so the URLs queued for a dead host fail at once instead of each
+    sleeping through its own retries. Once the cooldown is over a single
+    probe request is let through: success closes the breaker, another
+    failure opens it for a fresh cooldown.
+    """
+    
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            threshold: Consecutive failures that open the breaker for a host
+            cooldown: Seconds an open breaker rejects requests before a probe
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._state: Dict[str, Tuple[int, float]] = {}  # Host -> (consecutive failures, opened at)
+    
+    def allow(self, url: str) -> bool:
+        """
+        Check whether a request to the URL's host may go ahead.
+        
+        Args:
+            url: URL about to be requested
+            
+        Returns:
+            False while the host's breaker is open
+        """
+        host = urlsplit(url).netloc
+        failures, opened_at = self._state.get(host, (0, 0.0))
+        if failures < self.threshold:
+            return True
+        
+        now = time.monotonic()
+        if now - opened_at < self.cooldown:
+            return False
+        # Half-open: this caller is the probe; everyone else keeps waiting
+        # out a new cooldown until it reports back
+        self._state[host] = (failures, now)
+        return True
+    
+    def record_success(self, url: str):
+        """Close the breaker for the URL's host."""
+        self._state.pop(urlsplit(url).netloc, None)
+    
+    def record_failure(self, url: str):
+        """Count a failure against the URL's host, opening its breaker at the threshold."""
+        host = urlsplit(url).netloc
+        failures, opened_at = self._state.get(host, (0, 0.0))
+        failures += 1
+        if failures >= self.threshold:
+            opened_at = time.monotonic()
+        self._state[host] = (failures, opened_at)
+
 
 class ResponseHandler:
     """Handles HTTP responses and implements retry logic."""
     
-    def __init__(self, max_retries: int = 3):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        jitter_ratio: float = 0.5,
+        recoverable: Tuple[Type[BaseException], ...] = RECOVERABLE,
+        breaker: Optional[HostBreaker] = None
+    ):
         """
         Initialize response handler.
         
         Args:
             max_retries: Maximum number of retry attempts
+            base_backoff: Backoff before the first retry, doubled on each retry (seconds)
+            max_backoff: Upper bound on any single backoff, Retry-After included (seconds)
+            jitter_ratio: Randomize each backoff by up to this fraction, so
+                concurrent pages that failed together don't retry in lockstep
+            recoverable: Exception types with_retry retries, on top of
+                Chromium network errors; others propagate
+            breaker: Circuit breaker fed by handle_response (a new one if None)
         """
         self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter_ratio = jitter_ratio
+        self.recoverable = recoverable
+        self.breaker = breaker or HostBreaker()
+    
+    def is_recoverable(self, error: BaseException) -> bool:
+        """
+        Check whether an exception is a transient failure worth retrying.
+        
+        Args:
+            error: Exception raised by a navigation or other page call
+            
+        Returns:
+            True for self.recoverable types and Chromium net::ERR_* failures
+        """
+        if isinstance(error, self.recoverable):
+            return True
+        return isinstance(error, PlaywrightError) and NET_ERROR_MARKER in str(error)
+    
+    def compute_backoff(self, retry_count: int, headers: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """
+        Compute how long to wait before the next retry.
+        A server's Retry-After hint wins over exponential backoff; it is
+        only ever jittered upwards, never to before the time it names.
+        
+        Args:
+            retry_count: Current retry attempt
+            headers: Response headers (lower-case names, as Playwright gives them)
+            
+        Returns:
+            Delay in seconds, capped at max_backoff; None if Retry-After asks
+            for a longer wait than max_backoff, i.e. don't retry
+        """
+        retry_after = headers.get('retry-after') if headers else None
+        if retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                # Retrying before the named time only spends an attempt on
+                # another refusal
+                if delay > self.max_backoff:
+                    return None
+                return min(self.max_backoff, delay * random.uniform(1.0, 1.0 + self.jitter_ratio))
+        delay = self.base_backoff * 2 ** retry_count
+        # Cap after jittering, so the cap is a real upper bound
+        return min(self.max_backoff,
+                   delay * random.uniform(1.0 - self.jitter_ratio, 1.0 + self.jitter_ratio))
     
-    async def handle_response(
+    def handle_response(
         self, 
         response: Optional[Response], 
         url: str,
-        retry_callback: Optional[Callable] = None,
         retry_count: int = 0
-    ) -> bool:
+    ) -> HandlerResult:
         """
-        Handle HTTP response status codes with retry logic.
+        Classify an HTTP response status and decide whether to retry.
         
         Args:
             response: Response object from page navigation
             url: URL being accessed
-            retry_callback: Async function to call for retries
             retry_count: Current retry attempt
             
         Returns:
-            True if response is OK, False otherwise
+            OK if the response can be used, FAIL to give up, or a result
+            whose retry_after says how long to wait before trying again
         """
         if not response:
-            print(f"  ✗ No response received for: {url}")
-            return False
+            log.warning("  ✗ No response received for: %s", url)
+            self.breaker.record_failure(url)
+            return FAIL
         
         status = response.status
         
+        # Only server-side failures count against the host; a 4xx means it
+        # is up and answering
+        if status >= 500:
+            self.breaker.record_failure(url)
+        else:
+            self.breaker.record_success(url)
+        
         # 200: Success
         if status == 200:
-            return True
+            return OK
         
         # 404: Not Found
         elif status == 404:
-            print(f"  ✗ 404 Not Found: {url}")
-            return False
+            log.warning("  ✗ 404 Not Found: %s", url)
+            return FAIL
         
         # 403/401: Forbidden/Unauthorized
         elif status in [403, 401]:
-            if retry_count < self.max_retries and retry_callback:
-                print(f"  ⚠ {status}: Retrying... (attempt {retry_count + 1}/{self.max_retries})")
-                await asyncio.sleep(2)
-                return await retry_callback(retry_count + 1)
+            if retry_count < self.max_retries:
+                log.warning("  ⚠ %d: Retrying... (attempt %d/%d)", status, retry_count + 1, self.max_retries)
+                return HandlerResult(False, self.compute_backoff(retry_count))
             else:
-                print(f"  ✗ {status}: Max retries reached")
-                return False
+                log.warning("  ✗ %d: Max retries reached", status)
+                return FAIL
         
         # 429: Rate Limited
         elif status == 429:
-            if retry_count < self.max_retries and retry_callback:
-                backoff = (2 ** retry_count) + 1
-                print(f"  ⚠ 429: Rate limited, backing off for {backoff}s...")
-                await asyncio.sleep(backoff)
-                return await retry_callback(retry_count + 1)
+            if retry_count < self.max_retries:
+                backoff = self.compute_backoff(retry_count, response.headers)
+                if backoff is None:
+                    log.warning("  ✗ 429: Retry-After exceeds %.0fs, giving up", self.max_backoff)
+                    return FAIL
+                log.warning("  ⚠ 429: Rate limited, backing off for %.1fs...", backoff)
+                return HandlerResult(False, backoff)
             else:
-                print(f"  ✗ 429: Max retries reached")
-                return False
+                log.warning("  ✗ 429: Max retries reached")
+                return FAIL
         
         # 500/503: Server Error
         elif status in [500, 503]:
-            if retry_count < self.max_retries and retry_callback:
-                backoff = 2 ** retry_count
-                print(f"  ⚠ {status}: Server error, retrying in {backoff}s... (attempt {retry_count + 1}/{self.max_retries})")
-                await asyncio.sleep(backoff)
-                return await retry_callback(retry_count + 1)
+            if retry_count < self.max_retries:
+                backoff = self.compute_backoff(retry_count, response.headers)
+                if backoff is None:
+                    log.warning("  ✗ %d: Retry-After exceeds %.0fs, giving up", status, self.max_backoff)
+                    return FAIL
+                log.warning("  ⚠ %d: Server error, retrying in %.1fs... (attempt %d/%d)",
+                            status, backoff, retry_count + 1, self.max_retries)
+                return HandlerResult(False, backoff)
             else:
-                print(f"  ✗ {status}: Max retries reached")
-                return False
+                log.warning("  ✗ %d: Max retries reached", status)
+                return FAIL
         
         # Other status codes
         elif status >= 400:
-            print(f"  ✗ HTTP {status}: {url}")
-            return False
+            log.warning("  ✗ HTTP %d: %s", status, url)
+            return FAIL
         
-        return True
+        return OK
     
     async def with_retry(
         self,
@@ -108,6 +293,9 @@ class ResponseHandler:
             
         Returns:
             Result from func or None on failure
+            
+        Raises:
+            Any exception is_recoverable rejects, on the first attempt
         """
         retry_count = 0
         
@@ -115,12 +303,15 @@ class ResponseHandler:
             try:
                 return await func(*args, **kwargs)
             except Exception as e:
+                if not self.is_recoverable(e):
+                    raise
                 if retry_count < self.max_retries:
-                    print(f"  ↻ Error: {e}. Retrying... (attempt {retry_count + 1}/{self.max_retries})")
-                    await asyncio.sleep(2 ** retry_count)
+                    log.warning("  ↻ Error: %s. Retrying... (attempt %d/%d)",
+                                e, retry_count + 1, self.max_retries)
+                    await asyncio.sleep(self.compute_backoff(retry_count))
                     retry_count += 1
                 else:
-                    print(f"  ✗ Max retries reached after error: {e}")
+                    log.warning("  ✗ Max retries reached after error: %s", e)
                     return None
         
         return None
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 """AJAX form-based scraper using Playwright with async/await."""
 import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import List, Dict, Optional
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from browser_manager import BrowserManager
 from response_handler import ResponseHandler
 from quote_parser import QuoteParser
-from data_store import DataStore
+from data_store import DataStore, JsonLinesWriter
+from rate_limiter import AdaptiveRateLimiter
+
+log = logging.getLogger(__name__)
 
 
 class AjaxQuoteScraper:
@@ -16,37 +23,78 @@ class AjaxQuoteScraper:
         base_url: str,
         delay: float = 1.0,
         headless: bool = True,
-        max_retries: int = 3
+        max_retries: int = 3,
+        pool_size: int = 5,
+        block_resources: bool = True
     ):
         """
         Initialize the AJAX quote scraper.
         
         Args:
             base_url: Starting URL for scraping
-            delay: Delay between requests in seconds
+            delay: Initial delay between requests to a host in seconds;
+                adapts as the server answers (see AdaptiveRateLimiter)
             headless: Whether to run browser in headless mode
             max_retries: Maximum retry attempts for failed requests
+            pool_size: Number of browser pages kept open for searches, and so
+                the most searches that can run at once
+            block_resources: Skip downloading images, fonts, media and
+                stylesheets, which the parser never reads
         """
         self.base_url = base_url
         self.delay = delay
-        self.browser = BrowserManager(headless=headless)
+        self.browser = BrowserManager(headless=headless, block_resources=block_resources)
         self.response_handler = ResponseHandler(max_retries=max_retries)
         self.parser = QuoteParser()
         self.data_store = DataStore()
+        self.pool_size = pool_size
+        # Pages opened once in start() and lent out to searches, so a
+        # search doesn't pay for opening (and closing) a page of its own
+        self._page_pool: asyncio.Queue = asyncio.Queue()
+        self.rate_limiter = AdaptiveRateLimiter(initial_rate=1.0 / delay if delay > 0 else 10.0)
         self._browser_started = False
+        # get_form_options results keyed by author (None = no author picked);
+        # the option lists don't change during a session
+        self._form_options_cache: Dict[Optional[str], Dict[str, List[str]]] = {}
     
     async def start(self):
         """Start the browser. Call once before scraping."""
         if not self._browser_started:
             await self.browser.start()
+            for _ in range(self.pool_size):
+                self._page_pool.put_nowait(await self.browser.new_page())
             self._browser_started = True
     
     async def close(self):
         """Close the browser. Call when done with all scraping."""
         if self._browser_started:
+            while not self._page_pool.empty():
+                await self._page_pool.get_nowait().close()
             await self.browser.close()
             self._browser_started = False
     
+    async def _select_author(self, page: Page, author: str):
+        """
+        Select an author and wait for the tag list the form then loads
+        via AJAX, instead of sleeping for a guessed worst-case latency.
+        
+        Args:
+            page: Page holding the search form
+            author: Author name to select
+        """
+        async with page.expect_response(lambda r: '/filter.aspx' in r.url):
+            await page.select_option('select#author', author)
+        
+        # The response is in; give the page's handler a moment to fill the
+        # <select>. An author without tags leaves only the placeholder
+        try:
+            await page.wait_for_function(
+                "document.querySelector('select#tag').options.length > 1",
+                timeout=2000
+            )
+        except PlaywrightTimeoutError:
+            pass
+    
     async def get_form_options(self, author: Optional[str] = None) -> Dict[str, List[str]]:
         """
         Get available options from the search form.
@@ -57,6 +105,10 @@ class AjaxQuoteScraper:
         Returns:
             Dictionary with authors and tags available in the form
         """
+        cached = self._form_options_cache.get(author)
+        if cached is not None:
+            return {key: list(values) for key, values in cached.items()}
+        
         await self.browser.navigate(self.base_url)
         
         # Wait for form to load
@@ -75,9 +127,7 @@ class AjaxQuoteScraper:
         tag_options = []
         if author:
             # Select author to trigger tag loading
-            await self.browser.page.select_option('select#author', author)
-            # Wait for tags to load via AJAX
-            await asyncio.sleep(1)
+            await self._select_author(self.browser.page, author)
             tag_options = await self.browser.page.evaluate('''
                 () => {
                     const select = document.querySelector('select#tag');
@@ -86,15 +136,24 @@ class AjaxQuoteScraper:
                 }
             ''')
         
-        return {
+        self._form_options_cache[author] = {
             'authors': author_options,
             'tags': tag_options
         }
+        return {
+            'authors': list(author_options),
+            'tags': list(tag_options)
+        }
+    
+    def clear_form_cache(self):
+        """Forget cached form options, so the next lookup re-reads the form."""
+        self._form_options_cache.clear()
     
     async def search_quotes(
         self,
         author: Optional[str] = None,
-        tag: Optional[str] = None
+        tag: Optional[str] = None,
+        page: Optional[Page] = None
     ) -> List[Dict]:
         """
         Search for quotes using the AJAX form.
@@ -102,89 +161,156 @@ class AjaxQuoteScraper:
         Args:
             author: Author name to filter by
             tag: Tag to filter by
+            page: Page to run the search on (borrows one from the pool if None)
             
         Returns:
             List of quotes matching the criteria
         """
-        # Navigate to the search page
-        await self.browser.navigate(self.base_url)
-        
-        # Wait for form to load
-        await self.browser.wait_for_selector('form', timeout=10000)
+        if page is None:
+            page = await self._page_pool.get()
+            try:
+                return await self.search_quotes(author, tag, page)
+            finally:
+                # Returned as is: a page still showing results lets the next
+                # author search reuse its form
+                self._page_pool.put_nowait(page)
+        
+        # The results page carries the search form (and a fresh __VIEWSTATE)
+        # too, so a follow-up search can be submitted from it without
+        # reloading search.aspx. That needs an author, though: selecting one
+        # re-fetches the tag list, while without it the tag list would be
+        # whatever the previous search left behind
+        reuse_form = bool(author) and await page.query_selector('select#author') is not None
+        
+        if not reuse_form:
+            # Navigate to the search page
+            await self.rate_limiter.acquire(self.base_url)
+            response = await self.browser.navigate(self.base_url, page=page)
+            if response:
+                self.rate_limiter.record(self.base_url, response.status)
+            
+            # Wait for form to load
+            await self.browser.wait_for_selector('form', timeout=10000, page=page)
         
         # Fill out form fields
         if author:
-            await self.browser.page.select_option('select#author', author)
-            print(f"  Selected author: {author}")
-            await asyncio.sleep(0.5)
+            await self._select_author(page, author)
+            log.info("  Selected author: %s", author)
         
         if tag:
-            await self.browser.page.select_option('select#tag', tag)
-            print(f"  Selected tag: {tag}")
-            await asyncio.sleep(0.5)
-        
-        # Click the search button
-        await self.browser.page.click('input[type="submit"]')
-        print("  Submitted search form")
-        
-        # Wait for results to load (AJAX response)
-        # The form uses __VIEWSTATE, so we need to wait for the page to update
-        await asyncio.sleep(2)
-        
-        # Check if quotes are present
-        quote_elements = await self.browser.query_selector_all('.quote')
-        if not quote_elements:
-            print("  ⚠ No quotes found for the search criteria")
+            await page.select_option('select#tag', tag)
+            log.info("  Selected tag: %s", tag)
+        
+        # Click the search button. The form posts back (with its
+        # __VIEWSTATE) and the results come in as a new document, so wait
+        # for exactly that navigation rather than a fixed delay
+        await self.rate_limiter.acquire(self.base_url)
+        async with page.expect_navigation(wait_until="domcontentloaded") as navigation:
+            await page.click('input[type="submit"]')
+        response = await navigation.value
+        if response:
+            self.rate_limiter.record(self.base_url, response.status)
+        log.info("  Submitted search form")
+        
+        # Extract quotes (one round trip for the whole page)
+        quotes = await self.parser.parse_quotes_bulk(page)
+        if not quotes:
+            log.warning("  ⚠ No quotes found for the search criteria")
             return []
         
-        # Extract quotes
-        quotes = await self.parser.parse_quotes(quote_elements)
-        
-        print(f"  Found {len(quotes)} quotes")
+        log.info("  Found %d quotes", len(quotes))
         
         return quotes
     
-    async def scrape_by_all_authors(self) -> Dict[str, List[Dict]]:
+    async def _search_each(
+        self,
+        field: str,
+        values: List[str],
+        max_concurrent: int,
+        stream: Optional[JsonLinesWriter] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Run one search per value, up to max_concurrent at a time.
+        The form keeps its state per page, so each concurrent search
+        borrows a page of its own from the pool; pool_size caps
+        max_concurrent.
+        
+        Args:
+            field: Form field to search by ('author' or 'tag')
+            values: Values to search for
+            max_concurrent: Maximum number of searches in flight
+            stream: Writer each search's quotes are appended to as it finishes
+            
+        Returns:
+            Dictionary mapping each value to its quotes; values whose
+            search failed are left out
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def search_one(i: int, value: str) -> Optional[List[Dict]]:
+            async with semaphore:
+                log.info("[%d/%d] Scraping %s: %s", i, len(values), field, value)
+                # One failed search mustn't throw away the others' results
+                try:
+                    quotes = await self.search_quotes(**{field: value})
+                except Exception as e:
+                    log.error("  ✗ Error searching %s %s: %s", field, value, e)
+                    return None
+            if stream is not None:
+                stream.write_many(quotes)
+            return quotes
+        
+        quotes = await asyncio.gather(
+            *(search_one(i, value) for i, value in enumerate(values, 1))
+        )
+        
+        return {value: found for value, found in zip(values, quotes) if found is not None}
+    
+    async def scrape_by_all_authors(
+        self,
+        max_concurrent: int = 5,
+        stream: Optional[JsonLinesWriter] = None
+    ) -> Dict[str, List[Dict]]:
         """
         Scrape quotes for all available authors.
         
+        Args:
+            max_concurrent: Maximum number of searches in flight
+            stream: Writer (from DataStore.open_stream) each search's quotes
+                are appended to as soon as it finishes
+        
         Returns:
             Dictionary mapping author names to their quotes
         """
         options = await self.get_form_options()
         authors = options['authors']
         
-        print(f"Found {len(authors)} authors to scrape\n")
+        log.info("Found %d authors to scrape", len(authors))
         
-        results = {}
-        for i, author in enumerate(authors, 1):
-            print(f"[{i}/{len(authors)}] Scraping author: {author}")
-            quotes = await self.search_quotes(author=author)
-            results[author] = quotes
-            await asyncio.sleep(self.delay)
-        
-        return results
+        return await self._search_each('author', authors, max_concurrent, stream)
     
-    async def scrape_by_all_tags(self) -> Dict[str, List[Dict]]:
+    async def scrape_by_all_tags(
+        self,
+        max_concurrent: int = 5,
+        stream: Optional[JsonLinesWriter] = None
+    ) -> Dict[str, List[Dict]]:
         """
         Scrape quotes for all available tags.
         
+        Args:
+            max_concurrent: Maximum number of searches in flight
+            stream: Writer (from DataStore.open_stream) each search's quotes
+                are appended to as soon as it finishes
+        
         Returns:
             Dictionary mapping tag names to their quotes
         """
         options = await self.get_form_options()
         tags = options['tags']
         
-        print(f"Found {len(tags)} tags to scrape\n")
+        log.info("Found %d tags to scrape", len(tags))
         
-        results = {}
-        for i, tag in enumerate(tags, 1):
-            print(f"[{i}/{len(tags)}] Scraping tag: {tag}")
-            quotes = await self.search_quotes(tag=tag)
-            results[tag] = quotes
-            await asyncio.sleep(self.delay)
-        
-        return results
+        return await self._search_each('tag', tags, max_concurrent, stream)
     
     def save_quotes(self, quotes: List[Dict], filename: str):
         """Save quotes to JSON file."""
@@ -193,6 +319,15 @@ class AjaxQuoteScraper:
 
 async def main():
     """Example usage of AJAX scraper."""
+    # Scraper tasks only enqueue log records; the listener's background
+    # thread does the formatting and stderr writes. Raise the level to
+    # WARNING to hide per-page progress
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    
     url = "https://quotes.toscrape.com/search.aspx"
     
     print(f"AJAX Form-Based Scraper")
@@ -252,6 +387,7 @@ async def main():
     finally:
         # Close browser when done
         await scraper.close()
+        listener.stop()
 
 
 if __name__ == "__main__":
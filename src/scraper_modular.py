@@ -1,12 +1,23 @@
 #!/usr/bin/env python3
 """Modular web scraper using Playwright with async/await."""
 import asyncio
-from typing import List, Dict, Optional
-from collections import deque
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Dict, Optional, Set, Tuple
+from playwright.async_api import Page
 from browser_manager import BrowserManager
 from response_handler import ResponseHandler
 from quote_parser import QuoteParser
-from data_store import DataStore
+from data_store import DataStore, JsonLinesWriter
+from rate_limiter import AdaptiveRateLimiter
+
+try:
+    import uvloop
+except ImportError:  # Fall back to the stdlib event loop
+    uvloop = None
+
+log = logging.getLogger(__name__)
 
 
 class QuoteScraper:
@@ -18,25 +29,40 @@ class QuoteScraper:
         delay: float = 1.0,
         headless: bool = True,
         max_retries: int = 3,
-        selectors: Optional[Dict[str, str]] = None
+        selectors: Optional[Dict[str, str]] = None,
+        block_resources: bool = True,
+        user_data_dir: Optional[str] = None
     ):
         """
         Initialize the quote scraper.
         
         Args:
             base_url: Starting URL for scraping
-            delay: Delay between requests in seconds
+            delay: Initial delay between requests to a host in seconds;
+                adapts as the server answers (see AdaptiveRateLimiter)
             headless: Whether to run browser in headless mode
             max_retries: Maximum retry attempts for failed requests
             selectors: Custom CSS selectors for quote elements
+            block_resources: Skip downloading images, fonts, media and
+                stylesheets, which the parser never reads
+            user_data_dir: Browser profile directory to reuse across runs
+                (warm HTTP cache); workers then share its single context
         """
         self.base_url = base_url
         self.delay = delay
-        self.browser = BrowserManager(headless=headless)
+        self.browser = BrowserManager(
+            headless=headless,
+            block_resources=block_resources,
+            user_data_dir=user_data_dir
+        )
         self.response_handler = ResponseHandler(max_retries=max_retries)
         self.parser = QuoteParser(selectors=selectors)
         self.data_store = DataStore()
+        self.rate_limiter = AdaptiveRateLimiter(initial_rate=1.0 / delay if delay > 0 else 10.0)
         self._browser_started = False
+        # Scrapes currently running, keyed by (url, use_scroll), so concurrent
+        # requests for the same page share one fetch
+        self._inflight: Dict[Tuple[str, bool], asyncio.Task] = {}
         self.selectors = selectors or {
             'quote': '.quote',
             'text': '.text',
@@ -56,60 +82,157 @@ class QuoteScraper:
             await self.browser.close()
             self._browser_started = False
     
-    async def scrape_page(self, url: str, retry_count: int = 0, use_scroll: bool = False) -> tuple[List[Dict], Optional[str]]:
+    async def scrape_page(
+        self,
+        url: str,
+        use_scroll: bool = False,
+        seen: Optional[Set[bytes]] = None,
+        page: Optional[Page] = None
+    ) -> tuple[List[Dict], Optional[str]]:
         """
-        Scrape a single page.
+        Scrape a single page, retrying failed loads with backoff.
         
         Args:
             url: URL to scrape
-            retry_count: Current retry attempt
             use_scroll: Whether to use infinite scroll instead of pagination
+            seen: Fingerprints of quotes already collected in this run
+            page: Browser page to load it in (uses the main page if None);
+                concurrent scrapes each need their own
             
         Returns:
             Tuple of (quotes list, next page URL)
         """
-        # Navigate to page
-        response = await self.browser.navigate(url)
-        
-        # Handle response status
-        is_ok = await self.response_handler.handle_response(
-            response, 
-            url,
-            retry_callback=lambda rc: self.scrape_page(url, rc, use_scroll),
-            retry_count=retry_count
-        )
+        page = page or self.browser.page
+        handler = self.response_handler
         
-        if not is_ok:
-            return [], None
+        # Retries loop here rather than recursing through a callback
+        for retry_count in range(handler.max_retries + 1):
+            # Fail fast while the host looks down, rather than spending the
+            # remaining retries (and their backoff) on it
+            if not handler.breaker.allow(url):
+                log.warning("  ✗ Circuit open for host, skipping: %s", url)
+                return [], None
+            
+            await self.rate_limiter.acquire(url)
+            try:
+                response = await self.browser.navigate(url, page=page)
+            except Exception as e:
+                if not handler.is_recoverable(e):
+                    raise
+                # A refused connection or failed DNS lookup counts against
+                # the host like a 5xx does
+                handler.breaker.record_failure(url)
+                if retry_count >= handler.max_retries:
+                    log.warning("  ✗ Max retries reached after error: %s", e)
+                    return [], None
+                log.warning("  ↻ Error: %s. Retrying... (attempt %d/%d)",
+                            e, retry_count + 1, handler.max_retries)
+                await asyncio.sleep(handler.compute_backoff(retry_count))
+                continue
+            
+            if response:
+                self.rate_limiter.record(url, response.status)
+            
+            # Handle response status
+            result = handler.handle_response(response, url, retry_count)
+            if result.retry_after is None:
+                break
+            await asyncio.sleep(result.retry_after)
         
-        # Wait for content to load
-        try:
-            await self.browser.wait_for_selector(self.selectors['quote'], timeout=10000)
-        except Exception as e:
-            print(f"  ⚠ Could not find quote selector '{self.selectors['quote']}': {e}")
+        if not result.ok:
             return [], None
         
-        # If using scroll, scroll to load all content
+        quote_selector = self.selectors['quote']
+        
         if use_scroll:
-            scroll_count = await self.browser.scroll_to_bottom(pause_time=1.0, max_scrolls=10)
-            print(f"  Scrolled {scroll_count} times to load content")
+            # Scroll pages render their quotes with JS, so always wait for
+            # them; then scroll to load all content
+            if not await self._wait_for_quotes(page):
+                return [], None
+            scroll_count = await self.browser.scroll_to_bottom(pause_time=1.0, max_scrolls=10, page=page)
+            log.info("  Scrolled %d times to load content", scroll_count)
+            quotes, _ = await self.parser.parse_page(page, self.base_url, quote_selector)
+            # Infinite scroll has no next page
+            next_url = None
+        else:
+            # Extract quotes and the next page link (one round trip for both).
+            # Server-rendered quotes are in the DOM once navigation returns, so
+            # only an empty page pays for waiting on the selector and parsing again
+            quotes, next_url = await self.parser.parse_page(page, self.base_url, quote_selector)
+            if not quotes:
+                if not await self._wait_for_quotes(page):
+                    return [], None
+                quotes, next_url = await self.parser.parse_page(page, self.base_url, quote_selector)
+        
+        # Both paths are deduplicated here, in one place
+        if seen is not None:
+            quotes = self.parser.drop_seen(quotes, seen)
+        return quotes, next_url
+    
+    async def _wait_for_quotes(self, page: Page) -> bool:
+        """
+        Wait for quote elements to appear on the page.
         
-        # Extract quotes
-        quote_elements = await self.browser.query_selector_all(self.selectors['quote'])
-        quotes = await self.parser.parse_quotes(quote_elements)
+        Args:
+            page: Browser page to watch
+            
+        Returns:
+            False if none showed up in time
+        """
+        try:
+            await self.browser.wait_for_selector(self.selectors['quote'], timeout=10000, page=page)
+        except Exception as e:
+            log.warning("  ⚠ Could not find quote selector '%s': %s", self.selectors['quote'], e)
+            return False
+        return True
+    
+    async def scrape_page_shared(
+        self,
+        url: str,
+        use_scroll: bool = False,
+        page: Optional[Page] = None
+    ) -> tuple[List[Dict], Optional[str]]:
+        """
+        Scrape a page, coalescing concurrent requests for the same URL:
+        a caller arriving while the page is already being scraped waits for
+        that scrape instead of loading it again.
         
-        # Extract next page URL (only if not using scroll)
-        next_url = None if use_scroll else await self.parser.extract_next_page_url(
-            self.browser.page, self.base_url
-        )
+        Quotes are not deduplicated here (callers have their own `seen`
+        sets), so the shared result is the same for everyone.
         
-        return quotes, next_url
+        Args:
+            url: URL to scrape
+            use_scroll: Whether to use infinite scroll instead of pagination
+            page: Browser page to load it in, if this call ends up scraping
+            
+        Returns:
+            Tuple of (quotes list, next page URL)
+        """
+        key = (url, use_scroll)
+        while True:
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                # Shielded: a waiter giving up must not cancel the owner's scrape
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # We were cancelled ourselves
+                # The owner was cancelled, not us: try again
+        
+        task = asyncio.create_task(self.scrape_page(url, use_scroll=use_scroll, page=page))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await task
     
     async def scrape_all(
         self,
         max_pages: Optional[int] = None,
         max_concurrent: int = 5,
-        use_scroll: bool = False
+        use_scroll: bool = False,
+        stream: Optional[JsonLinesWriter] = None,
+        recycle_after: int = 50
     ) -> List[Dict]:
         """
         Scrape all pages in parallel.
@@ -118,99 +241,202 @@ class QuoteScraper:
             max_pages: Maximum number of pages to scrape
             max_concurrent: Maximum concurrent page scrapes
             use_scroll: Whether to use infinite scroll instead of pagination
+            stream: Writer (from DataStore.open_stream) that each page's new
+                quotes are appended to as soon as they are parsed (None =
+                only return them)
+            recycle_after: Pages a worker loads before replacing its browser
+                context, which bounds the memory a long crawl builds up
+                (not done on a persistent profile)
             
         Returns:
             List of all quotes
         """
         all_quotes = []
-        visited_urls = set()
-        to_visit = deque([self.base_url])
+        seen_quotes = set()  # Fingerprints, so a quote repeated across pages is kept once
+        visited_urls = {self.base_url}  # Marked when queued, so no URL is queued twice
+        url_queue: asyncio.Queue = asyncio.Queue()
+        url_queue.put_nowait(self.base_url)
         page_count = 0
-        semaphore = asyncio.Semaphore(max_concurrent)
-        lock = asyncio.Lock()
-        
-        print(f"Starting {'scroll' if use_scroll else 'parallel'} scrape from: {self.base_url}")
-        print(f"Max pages: {max_pages if max_pages else 'All'}")
-        print(f"Max concurrent: {max_concurrent}")
-        print()
-        
-        async def scrape_url_task(url: str):
-            """Task to scrape a single URL with concurrency control."""
-            async with semaphore:
-                print(f"Scraping: {url}")
-                quotes, next_url = await self.scrape_page(url, use_scroll=use_scroll)
-                
-                async with lock:
-                    all_quotes.extend(quotes)
-                    print(f"  Found {len(quotes)} quotes | Total: {len(all_quotes)}")
-                    
-                    if next_url and next_url not in visited_urls and next_url not in to_visit:
-                        to_visit.append(next_url)
-                
-                await asyncio.sleep(self.delay)
-        
-        while to_visit and (max_pages is None or page_count < max_pages):
-            # Prepare batch
-            batch_size = min(
-                max_concurrent,
-                len(to_visit),
-                (max_pages - page_count) if max_pages else len(to_visit)
-            )
+        
+        log.info("Starting %s scrape from: %s", 'scroll' if use_scroll else 'parallel', self.base_url)
+        log.info("Max pages: %s", max_pages if max_pages else 'All')
+        log.info("Max concurrent: %d", max_concurrent)
+        
+        async def worker():
+            """Scrape URLs from the queue until cancelled, in a context of its own."""
+            nonlocal page_count
+            # Workers share all_quotes, seen_quotes, visited_urls and
+            # page_count without a lock: they all run on one event loop and
+            # none of the check-then-update steps below awaits in between
+            async def open_page():
+                # A persistent profile is one context, so its pages share it
+                if self.browser.user_data_dir:
+                    return None, await self.browser.new_page()
+                context = await self.browser.new_context()
+                return context, await context.new_page()
             
-            batch = []
-            for _ in range(batch_size):
-                if to_visit:
-                    url = to_visit.popleft()
-                    if url not in visited_urls:
-                        visited_urls.add(url)
-                        batch.append(url)
+            # A worker that can't get a page exits with the error; scrape_all
+            # notices when no worker is left to drain the queue
+            try:
+                context, page = await open_page()
+            except Exception as e:
+                log.error("  ✗ Worker could not open a browser page: %s", e)
+                raise
+            uses = 0
+            try:
+                while True:
+                    url = await url_queue.get()
+                    try:
+                        if max_pages is not None and page_count >= max_pages:
+                            continue
                         page_count += 1
-            
-            if not batch:
-                break
-            
-            # Scrape batch in parallel
-            tasks = [scrape_url_task(url) for url in batch]
-            await asyncio.gather(*tasks)
+                        
+                        if context is not None and uses >= recycle_after:
+                            old_context, context, page = context, None, None
+                            try:
+                                await old_context.close()
+                                context, page = await open_page()
+                            except Exception as e:
+                                log.error("  ✗ Worker could not open a new browser context: %s", e)
+                                # Hand the URL to a worker that still has a page
+                                page_count -= 1
+                                url_queue.put_nowait(url)
+                                raise
+                            uses = 0
+                        uses += 1
+                        
+                        log.info("Scraping: %s", url)
+                        try:
+                            quotes, next_url = await self.scrape_page_shared(
+                                url, use_scroll=use_scroll, page=page
+                            )
+                        except Exception as e:
+                            log.error("  ✗ Error scraping %s: %s", url, e)
+                            continue
+                        
+                        quotes = self.parser.drop_seen(quotes, seen_quotes)
+                        all_quotes.extend(quotes)
+                        if stream is not None:
+                            stream.write_many(quotes)
+                        log.info("  Found %d quotes | Total: %d", len(quotes), len(all_quotes))
+                        
+                        if next_url and next_url not in visited_urls:
+                            visited_urls.add(next_url)
+                            url_queue.put_nowait(next_url)
+                    finally:
+                        url_queue.task_done()
+            finally:
+                if context is not None or page is not None:
+                    await (context or page).close()
         
-        print(f"\nScraping complete!")
-        print(f"Total pages scraped: {page_count}")
-        print(f"Total quotes collected: {len(all_quotes)}")
+        # Long-lived workers pull the next URL as soon as they are free, so a
+        # slow page no longer holds up a whole batch
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrent)]
+        joined = asyncio.create_task(url_queue.join())
+        try:
+            # Workers only ever stop on an error. Wait for the queue to drain
+            # or for the last worker to die, since join() alone would then
+            # wait forever
+            alive = set(workers)
+            while alive:
+                done, _ = await asyncio.wait({joined, *alive}, return_when=asyncio.FIRST_COMPLETED)
+                if joined in done:
+                    break
+                alive -= done
+            else:
+                raise workers[0].exception()
+        finally:
+            joined.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(joined, *workers, return_exceptions=True)
+        
+        log.info("Scraping complete!")
+        log.info("Total pages scraped: %d", page_count)
+        log.info("Total quotes collected: %d", len(all_quotes))
         
         return all_quotes
     
-    async def scrape_by_tag(self, tag: str) -> List[Dict]:
+    async def scrape_by_tag(self, tag: str, prefetch: int = 3) -> List[Dict]:
         """
         Scrape quotes filtered by tag.
         
+        Tag pages follow a predictable /page/N/ scheme, so the next
+        `prefetch - 1` pages are loaded speculatively (each in its own
+        browser page) while the current one is processed. A prefetched page
+        is only used if the previous page's "next" link really points to
+        it; on the first mismatch prefetching stops and the crawl follows
+        the real links one at a time.
+        
         Args:
             tag: Tag to filter by
+            prefetch: Number of tag pages loaded at once (1 = strictly serial)
             
         Returns:
             List of quotes with the tag
         """
-        url = f"{self.base_url}/tag/{tag}/"
-        print(f"Scraping quotes with tag: '{tag}'")
-        print(f"URL: {url}\n")
+        url = f"{self.base_url.rstrip('/')}/tag/{tag}/"
+        log.info("Scraping quotes with tag: '%s'", tag)
+        log.info("URL: %s", url)
+        
+        def guess_url(n: int) -> str:
+            return url if n == 1 else f"{url}page/{n}/"
+        
+        pages = [await self.browser.new_page() for _ in range(max(1, prefetch))]
+        pool: asyncio.Queue = asyncio.Queue()
+        for page in pages:
+            pool.put_nowait(page)
+        
+        async def fetch(page_url: str):
+            page = await pool.get()
+            try:
+                return await self.scrape_page_shared(page_url, page=page)
+            finally:
+                # Pacing is up to the rate limiter, not the page pool
+                pool.put_nowait(page)
         
         all_quotes = []
-        current_url = url
+        seen_quotes = set()
+        speculate = prefetch > 1
+        tasks = {1: asyncio.create_task(fetch(url))}  # Page number -> task
         page_count = 0
         
-        while current_url:
-            page_count += 1
-            print(f"Scraping page {page_count}: {current_url}")
-            
-            quotes, next_url = await self.scrape_page(current_url)
-            all_quotes.extend(quotes)
-            
-            print(f"  Found {len(quotes)} quotes on this page")
-            
-            current_url = next_url
-            if current_url:
-                await asyncio.sleep(self.delay)
+        try:
+            while True:
+                page_count += 1
+                if speculate:
+                    for n in range(page_count + 1, page_count + prefetch):
+                        if n not in tasks:
+                            tasks[n] = asyncio.create_task(fetch(guess_url(n)))
+                
+                log.info("Scraping page %d", page_count)
+                quotes, next_url = await tasks.pop(page_count)
+                # Dedupe in page order, after a page is known to be the real one
+                quotes = self.parser.drop_seen(quotes, seen_quotes)
+                all_quotes.extend(quotes)
+                
+                log.info("  Found %d quotes on this page", len(quotes))
+                
+                if not next_url:
+                    break
+                
+                if next_url != guess_url(page_count + 1):
+                    # Pagination isn't /page/N/ after all: drop the guesses
+                    speculate = False
+                    for task in tasks.values():
+                        task.cancel()
+                    tasks = {page_count + 1: asyncio.create_task(fetch(next_url))}
+                elif not speculate:
+                    tasks[page_count + 1] = asyncio.create_task(fetch(next_url))
+        finally:
+            # Pages past the last one were fetched for nothing; stop them
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            for page in pages:
+                await page.close()
         
-        print(f"\nTotal quotes with tag '{tag}': {len(all_quotes)}")
+        log.info("Total quotes with tag '%s': %d", tag, len(all_quotes))
         return all_quotes
     
     def save_quotes(self, quotes: List[Dict], filename: str):
@@ -220,6 +446,15 @@ class QuoteScraper:
 
 async def main():
     """Example usage of modular scraper."""
+    # Scraper tasks only enqueue log records; the listener's background
+    # thread does the formatting and stderr writes. Raise the level to
+    # WARNING to hide per-page progress
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    
     # List of available URLs
     urls = [
         "https://quotes.toscrape.com/", # microdata and pagination
@@ -305,7 +540,12 @@ async def main():
     finally:
         # Close browser once when done with all scraping
         await scraper.close()
+        listener.stop()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop's libuv-based loop dispatches socket events in C
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -1,18 +1,256 @@
 #!/usr/bin/env python3
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from selectolax.parser import HTMLParser
+from urllib.parse import (urljoin, urlparse, urlsplit, urlunsplit, urlunparse,
+                          quote, unquote, SplitResult)
 from urllib.robotparser import RobotFileParser
-from typing import Set, List, Optional
+from typing import Dict, Set, List, Optional, TextIO, Tuple, Union
 from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
+import logging
+import math
+import os
+import queue
+import socket
+from functools import lru_cache
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
 import threading
 import time
 import random
+import re
+
+
+log = logging.getLogger(__name__)
+
+
+# Non-HTML file extensions that are recorded but never crawled
+_SKIP_EXTENSIONS = frozenset({
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico',
+    '.zip', '.tar', '.gz', '.rar', '.7z',
+    '.mp3', '.mp4', '.avi', '.mov', '.wmv',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.xml', '.json', '.csv', '.txt',
+    '.css', '.js', '.woff', '.woff2', '.ttf', '.eot',
+})
+
+# Link schemes that never lead to a crawlable page
+_SKIP_SCHEMES = ('mailto:', 'javascript:', 'tel:', 'data:')
+
+# Path suffixes that are taken to be HTML without a HEAD probe
+_HTML_EXTENSIONS = frozenset({'', '.html', '.htm', '.php', '.asp', '.aspx', '.jsp'})
+
+
+@lru_cache(maxsize=8192)
+def _parse(url: str) -> SplitResult:
+    """
+    Cached urlsplit for hot-path URL checks.
+    The same nav/pagination links recur on every page, so hits are common,
+    and urlsplit skips the ;params parsing urlparse does.
+    """
+    return urlsplit(url)
+
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that only track the visitor and never change the page.
+# Matched against the start of a raw "key=value" pair, case-insensitively,
+# in one compiled pattern instead of partition + lower + set lookup per pair
+_TRACKING_PARAMS = frozenset({'gclid', 'fbclid', 'msclkid', 'dclid', 'mc_cid', 'mc_eid', '_ga'})
+_TRACKING_PARAM_RE = re.compile(
+    r'(?:utm_[^=]*|' + '|'.join(sorted(_TRACKING_PARAMS)) + r')(?:=|$)',
+    re.IGNORECASE,
+)
+_is_tracking_param = _TRACKING_PARAM_RE.match
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings of the same page
+    dedupe to one entry: lowercase scheme and host, drop the default port
+    and the fragment, drop tracking parameters (utm_*, gclid, ...) and
+    sort the rest of the query.
+    
+    Trailing slashes are kept: "/dir/" and "/dir" resolve relative links
+    differently, so they are not interchangeable.
+    
+    Args:
+        url: Absolute URL
+        
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and port == _DEFAULT_PORTS.get(scheme):
+        netloc = netloc.rsplit(':', 1)[0]
+    
+    # Sort the raw "k=v" pairs so their percent-encoding is left untouched
+    query = parts.query
+    if query:
+        query = '&'.join(sorted(pair for pair in query.split('&')
+                                if pair and not _is_tracking_param(pair)))
+    
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+_getaddrinfo = socket.getaddrinfo
+_dns_cache: Dict[tuple, Tuple[list, float]] = {}
+
+
+def enable_dns_cache(ttl: float = 300) -> None:
+    """
+    Cache DNS lookups process-wide for `ttl` seconds.
+    urllib3 calls socket.getaddrinfo for every new connection; on
+    multi-host crawls that is a blocking resolver round trip each time.
+    
+    Args:
+        ttl: Seconds to keep a resolved address
+    """
+    def cached_getaddrinfo(host, port, *args, **kwargs):
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        
+        cached = _dns_cache.get(key)
+        if cached and now - cached[1] < ttl:
+            return cached[0]
+        
+        result = _getaddrinfo(host, port, *args, **kwargs)
+        _dns_cache[key] = (result, now)
+        return result
+    
+    socket.getaddrinfo = cached_getaddrinfo
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter for URL membership.
+    About 2.4 bytes per URL at a 1e-4 false-positive rate, versus well
+    over 100 bytes for a URL string in a set. A false positive only means
+    a URL is treated as already enqueued and skipped.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        """
+        Initialize the filter.
+        
+        Args:
+            capacity: Number of URLs the filter is sized for
+            error_rate: False-positive rate at full capacity
+        """
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, url: str):
+        """Yield the bit positions for a URL (double hashing over one digest)."""
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, url: str) -> None:
+        """Add a URL to the filter."""
+        for pos in self._positions(url):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, url: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(url))
+
+
+class RobotsRules:
+    """
+    Prefix trie over a parsed robots.txt's Allow/Disallow rules.
+    RobotFileParser.can_fetch scans every rule line for every URL; the
+    trie is built once per user agent, after which a check is one walk
+    down the URL path. The longest matching rule wins (RFC 9309), with
+    Allow winning a tie.
+    """
+    
+    def __init__(self, parser: RobotFileParser):
+        """
+        Initialize the rules.
+        
+        Args:
+            parser: RobotFileParser that has already read robots.txt
+        """
+        self.parser = parser
+        self._tries: Dict[str, dict] = {}  # User agent -> rule trie
+    
+    def _build_trie(self, user_agent: str) -> dict:
+        """
+        Build the rule trie for the entry that applies to a user agent.
+        Each node maps a path character to its child; the None key holds
+        the allowance of a rule ending at that node.
+        """
+        entry = next((e for e in self.parser.entries if e.applies_to(user_agent)),
+                     self.parser.default_entry)
+        root: dict = {}
+        if entry is None:
+            return root
+        
+        for rule in entry.rulelines:
+            node = root
+            # "*" matches every path, same as an empty prefix
+            for char in ('' if rule.path == '*' else rule.path):
+                node = node.setdefault(char, {})
+            node[None] = node.get(None, False) or rule.allowance
+        return root
+    
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        """
+        Check if the URL can be fetched by the user agent.
+        
+        Args:
+            user_agent: User-Agent the request will be sent with
+            url: URL to check
+            
+        Returns:
+            True if URL can be fetched
+        """
+        if self.parser.disallow_all:
+            return False
+        if self.parser.allow_all:
+            return True
+        
+        trie = self._tries.get(user_agent)
+        if trie is None:
+            trie = self._tries[user_agent] = self._build_trie(user_agent)
+        
+        # Normalize the path the same way RobotFileParser does
+        parsed = urlparse(unquote(url))
+        path = quote(urlunparse(('', '', parsed.path, parsed.params, parsed.query, ''))) or '/'
+        
+        # Walk the path, remembering the deepest (longest) rule passed
+        node = trie
+        allowed = node.get(None, True)
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            allowed = node.get(None, allowed)
+        return allowed
+    
+    def crawl_delay(self, user_agent: str) -> Optional[float]:
+        """Get the Crawl-delay for the user agent, if robots.txt sets one."""
+        return self.parser.crawl_delay(user_agent)
 
 
 class WebCrawler:
-    def __init__(self, max_pages: int = 50, delay: float = 1.0, max_workers: int = 1):
+    def __init__(self, max_pages: int = 50, delay: float = 1.0, max_workers: int = 1,
+                 frontier_capacity: Optional[int] = None,
+                 state_path: Optional[str] = None, checkpoint_every: int = 50):
         """
         Initialize the web crawler.
         
@@ -20,49 +258,159 @@ class WebCrawler:
             max_pages: Maximum number of pages to crawl
             delay: Delay between requests in seconds
             max_workers: Number of concurrent threads (1 = single-threaded)
+            frontier_capacity: If set, track enqueued URLs in a Bloom filter
+                sized for this many URLs instead of a set (for huge crawls)
+            state_path: If set, log the crawl to this file (JSON lines, plus a
+                frontier snapshot in state_path + '.frontier') and resume an
+                interrupted crawl of the same start URL from it. Removed
+                once the crawl finishes
+            checkpoint_every: Number of newly visited pages between checkpoints
         """
         self.max_pages = max_pages
         self.delay = delay
         self.max_workers = max_workers
+        self.state_path = state_path
+        self.checkpoint_every = checkpoint_every
+        self._checkpointed = 0  # len(visited_urls) at the last checkpoint
+        self._state_log: Optional[TextIO] = None  # Open state_path while crawling
         self.visited_urls: Set[str] = set()
+        # Every URL ever added to the frontier
+        self.enqueued_urls: Union[Set[str], BloomFilter] = (
+            BloomFilter(frontier_capacity) if frontier_capacity else set()
+        )
         self.files_found: Set[str] = set()  # Track non-HTML files
         self.lock = threading.Lock()  # Thread-safe access to shared data
+        # Worker threads stage non-HTML file URLs in thread-local lists that
+        # the main thread merges into files_found between batches, so the
+        # per-link hot path never takes self.lock
+        self._local = threading.local()
+        self._staged_files: List[List[str]] = []
         self.session = requests.Session()
+        # Size the connection pool to the worker count so every thread keeps
+        # its own warm keep-alive connection instead of reconnecting (TCP+TLS)
+        # per page. pool_connections is the number of *hosts* to keep pools
+        # for (the site plus e.g. a www./CDN redirect target), not a
+        # connection count. Retries are handled in fetch_with_retry, not by
+        # urllib3, so failures aren't retried twice over.
+        adapter = HTTPAdapter(pool_connections=10,
+                              pool_maxsize=self.max_workers * 2,
+                              max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.user_agents = [
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
         ]
         self.session.headers.update({
-            'User-Agent': self.user_agents[0]
+            'User-Agent': self.user_agents[0],
+            # Every encoding urllib3 can decode: gzip/deflate, plus br and
+            # zstd when brotli/zstandard are installed. HTML compresses
+            # 3-5x and is decompressed transparently on read
+            'Accept-Encoding': ACCEPT_ENCODING
         })
-        self.robot_parser = RobotFileParser()
+        # Parsed robots.txt per host: {netloc: (parser, fetched_at)}
+        self._robots_cache: Dict[str, Tuple[RobotsRules, float]] = {}
+        self.robots_ttl = 6 * 3600  # Re-fetch robots.txt after 6 hours
         self.max_retries = 3
         self.retry_delay_base = 2  # Base delay for exponential backoff
+        self.max_bytes = 5 * 1024 * 1024  # Skip pages larger than 5 MB
+        self._last_hit: Dict[str, float] = {}  # Host -> time of its last request
+        self._probed_types: Dict[Tuple[str, str], bool] = {}  # (host, ext) -> serves HTML
+    
+    def close(self) -> None:
+        """Close the session's pooled keep-alive connections."""
+        self.session.close()
     
-    def rotate_user_agent(self) -> None:
-        """Rotate to a different user agent."""
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def rotate_user_agent(self) -> Dict[str, str]:
+        """
+        Pick a different user agent for a single request.
+        The shared session headers are left alone, so a rotation in one
+        worker thread never changes requests other threads have in flight.
+        
+        Returns:
+            Per-request headers carrying the new User-Agent
+        """
         user_agent = random.choice(self.user_agents)
-        self.session.headers.update({'User-Agent': user_agent})
-        print(f"  ↻ Rotated user agent")
+        log.debug("  ↻ Rotated user agent")
+        return {'User-Agent': user_agent}
     
-    def load_robots_txt(self, base_url: str) -> None:
+    def load_robots_txt(self, url: str) -> RobotsRules:
         """
-        Load and parse the robots.txt file for the domain.
+        Load and parse the robots.txt file for the URL's host.
+        Parsed files are cached per host for robots_ttl seconds.
         
         Args:
-            base_url: Base URL of the website
+            url: Any URL on the website
+            
+        Returns:
+            Rules from the host's robots.txt
         """
-        parsed = urlparse(base_url)
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        parsed = urlparse(url)
+        host = parsed.netloc
+        
+        cached = self._robots_cache.get(host)
+        if cached and time.time() - cached[1] < self.robots_ttl:
+            return cached[0]
+        
+        robots_url = f"{parsed.scheme}://{host}/robots.txt"
+        parser = RobotFileParser(robots_url)
         
         try:
-            self.robot_parser.set_url(robots_url)
-            self.robot_parser.read()
-            print(f"Loaded robots.txt from: {robots_url}")
-        except Exception as e:
-            print(f"Could not load robots.txt: {e}")
-            print("Proceeding without robots.txt restrictions")
+            # Fetch through the session so robots.txt reuses the pooled connection
+            response = self.session.get(robots_url, timeout=10)
+            
+            # 401/403 and server errors disallow everything,
+            # any other 4xx means the site has no robots.txt
+            if response.status_code in [401, 403] or response.status_code >= 500:
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+            log.info("Loaded robots.txt from: %s", robots_url)
+        except requests.exceptions.RequestException as e:
+            log.warning("Could not load robots.txt: %s", e)
+            log.warning("Proceeding without robots.txt restrictions")
+            parser.allow_all = True
+        
+        rules = RobotsRules(parser)
+        self._robots_cache[host] = (rules, time.time())
+        return rules
+    
+    def _stage_file(self, url: str) -> None:
+        """
+        Record a non-HTML file URL in the calling thread's staging list.
+        
+        Args:
+            url: URL of the file
+        """
+        files = getattr(self._local, 'files', None)
+        if files is None:
+            # First file seen by this thread: register its list (once per thread)
+            files = self._local.files = []
+            with self.lock:
+                self._staged_files.append(files)
+        files.append(url)
+    
+    def _merge_staged_files(self) -> None:
+        """
+        Move every thread's staged file URLs into files_found.
+        Must only be called while no worker is running (between batches).
+        """
+        for files in self._staged_files:
+            if self._state_log is not None:
+                for url in files:
+                    if url not in self.files_found:
+                        self._state_log.write(json.dumps({'file': url}) + '\n')
+            self.files_found.update(files)
+            files.clear()
     
     # this is a boundary check to prevent the crawler from wandering off
     # only follow sites in this domain. don't wander off to external sites
@@ -81,30 +429,75 @@ class WebCrawler:
         """
 
         # If we have a url like "https://books.toscrape.com/page"
-        # urlparse(url).netloc will return "books.toscrape.com"
-        # netloc = network location. checks if the URL has a domain
-        # bool(netloc) is a short handed way to make sure netloc is not empty
-        parsed = urlparse(url)
-        
-        # Must have a domain and match base domain
-        if not (bool(parsed.netloc) and parsed.netloc == base_domain):
+        # the netloc (network location) is "books.toscrape.com".
+        # Slice it out by hand: it sits between "://" and the first
+        # "/", "?" or "#". Most links on a page point elsewhere, so this
+        # rejects them before any URL parsing happens
+        start = url.find('://') + 3
+        if start < 3:
             return False
+        end = len(url)
+        for sep in '/?#':
+            pos = url.find(sep, start, end)
+            if pos != -1:
+                end = pos
         
-        # Skip non-HTML files
-        skip_extensions = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico',
-                          '.zip', '.tar', '.gz', '.rar', '.7z',
-                          '.mp3', '.mp4', '.avi', '.mov', '.wmv',
-                          '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-                          '.xml', '.json', '.csv', '.txt',
-                          '.css', '.js', '.woff', '.woff2', '.ttf', '.eot')
+        # Must match base domain (an empty netloc never does)
+        if url[start:end] != base_domain:
+            return False
         
-        if url.lower().endswith(skip_extensions):
-            with self.lock:
-                self.files_found.add(url)
+        # Skip non-HTML files. Only the short path suffix is lowercased,
+        # and the lookup is a single set probe
+        ext = os.path.splitext(_parse(url).path)[1].lower()
+        if ext in _SKIP_EXTENSIONS:
+            self._stage_file(url)
             return False
         
         return True
     
+    def is_html_url(self, url: str) -> bool:
+        """
+        Check whether a URL with an unfamiliar extension serves HTML.
+        Issues a HEAD request once per (host, extension) and caches the
+        answer, so e.g. every .cgi link on a site costs a single probe.
+        
+        Args:
+            url: URL to check
+            
+        Returns:
+            False if the server reports a non-HTML Content-Type
+        """
+        parsed = _parse(url)
+        ext = os.path.splitext(parsed.path)[1].lower()
+        if ext in _HTML_EXTENSIONS:
+            return True
+        
+        key = (parsed.netloc, ext)
+        with self.lock:
+            is_html = self._probed_types.get(key)
+        
+        if is_html is None:
+            # The probe is a request to the host like any other, so it
+            # takes a politeness slot of its own, as fetch_with_retry's GET does
+            self.wait_for_host(url)
+            try:
+                response = self.session.head(url, allow_redirects=True, timeout=10)
+            except requests.exceptions.RequestException:
+                return True  # Let the GET and its retry logic decide
+            
+            # Servers that reject HEAD tell us nothing about the content
+            if response.status_code >= 400:
+                return True
+            
+            # Matches text/html and application/xhtml+xml
+            is_html = 'html' in response.headers.get('Content-Type', '')
+            with self.lock:
+                self._probed_types[key] = is_html
+        
+        if not is_html:
+            self._stage_file(url)
+        return is_html
+    
     def can_fetch(self, url: str) -> bool:
         """
         Check if the URL can be fetched according to robots.txt.
@@ -116,22 +509,99 @@ class WebCrawler:
             True if URL can be fetched
         """
         user_agent = self.session.headers.get('User-Agent', '*')
-        return self.robot_parser.can_fetch(user_agent, url)
+        return self.load_robots_txt(url).can_fetch(user_agent, url)
     
-    def fetch_with_retry(self, url: str, timeout: int = 10, retry_count: int = 0) -> Optional[requests.Response]:
+    def politeness_delay(self, url: str) -> float:
+        """
+        Get the minimum spacing between requests to the URL's host.
+        
+        Args:
+            url: URL about to be fetched
+            
+        Returns:
+            The larger of self.delay and the robots.txt Crawl-delay
+        """
+        user_agent = self.session.headers.get('User-Agent', '*')
+        crawl_delay = self.load_robots_txt(url).crawl_delay(user_agent)
+        return max(self.delay, float(crawl_delay or 0))
+    
+    def wait_for_host(self, url: str) -> None:
+        """
+        Sleep only for whatever is left of the host's delay since its last
+        request, so time already spent fetching counts toward the delay.
+        Safe to call from worker threads: each caller reserves the host's
+        next free slot under the lock and sleeps outside it.
+        
+        Args:
+            url: URL about to be fetched
+        """
+        host = _parse(url).netloc
+        delay = self.politeness_delay(url)
+        
+        with self.lock:
+            now = time.monotonic()
+            last_hit = self._last_hit.get(host)
+            slot = now if last_hit is None else max(now, last_hit + delay)
+            self._last_hit[host] = slot
+        
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def fetch_with_retry(self, url: str, timeout: int = 10) -> Optional[requests.Response]:
         """
         Fetch URL with retry logic and exponential backoff.
         
         Args:
             url: URL to fetch
             timeout: Request timeout in seconds
-            retry_count: Current retry attempt
             
         Returns:
             Response object if successful, None otherwise
         """
-        try:
-            response = self.session.get(url, timeout=timeout)
+        headers = None  # Per-request overrides, set when rotating user agent
+        
+        # Retries loop in place rather than recursing, so a failing URL
+        # costs one stack frame no matter how many attempts it takes
+        for retry_count in range(self.max_retries + 1):
+            can_retry = retry_count < self.max_retries
+            
+            try:
+                # Every attempt is a request to the host, so each one
+                # reserves its own politeness slot
+                self.wait_for_host(url)
+                # Stream so get_links can stop reading oversized bodies
+                response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+            
+            except requests.exceptions.Timeout:
+                # Timeout - retry with longer timeout
+                if can_retry:
+                    timeout += 5
+                    log.debug("  ⚠ Timeout: Retrying with %ss timeout... (attempt %d/%d)",
+                              timeout, retry_count + 1, self.max_retries)
+                    time.sleep(1)
+                    continue
+                log.warning("  ✗ Timeout: Max retries reached: %s", url)
+                return None
+            
+            except requests.exceptions.ConnectionError:
+                # Connection error - retry with backoff
+                if can_retry:
+                    backoff = self.retry_delay_base ** retry_count
+                    log.debug("  ⚠ Connection Error: Retrying in %ss... (attempt %d/%d)",
+                              backoff, retry_count + 1, self.max_retries)
+                    time.sleep(backoff)
+                    continue
+                log.warning("  ✗ Connection Error: Max retries reached: %s", url)
+                return None
+            
+            except requests.exceptions.RequestException as e:
+                log.warning("  ✗ Error: %s", e)
+                return None
+            
+            # A streamed response holds its pooled connection until the body
+            # is read or the response is closed
+            if response.status_code not in [200, 301, 302]:
+                response.close()
             
             # 200: Success
             if response.status_code == 200:
@@ -139,12 +609,12 @@ class WebCrawler:
             
             # 301/302: Redirect (requests follows automatically)
             elif response.status_code in [301, 302]:
-                print(f"  → Redirected to: {response.url}")
+                log.debug("  → Redirected to: %s", response.url)
                 return response
             
             # 404: Page not found - skip, log, don't retry
             elif response.status_code == 404:
-                print(f"  ✗ Not Found (404): Skipping")
+                log.info("  ✗ Not Found (404): Skipping %s", url)
                 return None
             
             # for 401 - unauthorized, skip unless you have credentials
@@ -155,69 +625,76 @@ class WebCrawler:
 
             # 403/401: Forbidden/Unauthorized - rotate user agent and retry
             elif response.status_code in [403, 401]:
-                if retry_count < self.max_retries:
-                    print(f"  ⚠ {response.status_code}: Rotating user agent and retrying...")
-                    self.rotate_user_agent()
+                if can_retry:
+                    log.debug("  ⚠ %d: Rotating user agent and retrying...", response.status_code)
+                    headers = self.rotate_user_agent()
                     time.sleep(1)
-                    return self.fetch_with_retry(url, timeout, retry_count + 1)
-                else:
-                    print(f"  ✗ {response.status_code}: Max retries reached")
-                    return None
+                    continue
+                log.warning("  ✗ %d: Max retries reached: %s", response.status_code, url)
+                return None
             
             # 429: Too Many Requests - exponential backoff with jitter
             # rate limited
             # thundering herd problem (all 1000 retry requests slam the server at the same time)
             # jitter is needed to spread out requests over time
             elif response.status_code == 429:
-                if retry_count < self.max_retries:
+                if can_retry:
                     backoff = (self.retry_delay_base ** retry_count) + random.uniform(0, 1)
-                    print(f"  ⚠ 429: Rate limited, backing off for {backoff:.1f}s...")
+                    log.debug("  ⚠ 429: Rate limited, backing off for %.1fs...", backoff)
                     time.sleep(backoff)
-                    return self.fetch_with_retry(url, timeout, retry_count + 1)
-                else:
-                    print(f"  ✗ 429: Max retries reached")
-                    return None
+                    continue
+                log.warning("  ✗ 429: Max retries reached: %s", url)
+                return None
             
             # 500/503: Server errors - retry with backoff (up to 3x)
             elif response.status_code in [500, 503]:
-                if retry_count < self.max_retries:
+                if can_retry:
                     backoff = self.retry_delay_base ** retry_count
-                    print(f"  ⚠ {response.status_code}: Server error, retrying in {backoff}s... (attempt {retry_count + 1}/{self.max_retries})")
+                    log.debug("  ⚠ %d: Server error, retrying in %ss... (attempt %d/%d)",
+                              response.status_code, backoff, retry_count + 1, self.max_retries)
                     time.sleep(backoff)
-                    return self.fetch_with_retry(url, timeout, retry_count + 1)
-                else:
-                    print(f"  ✗ {response.status_code}: Max retries reached")
-                    return None
+                    continue
+                log.warning("  ✗ %d: Max retries reached: %s", response.status_code, url)
+                return None
             
             else:
-                print(f"  ? Unexpected status code: {response.status_code}")
+                log.info("  ? Unexpected status code: %d", response.status_code)
                 return None
         
-        except requests.exceptions.Timeout:
-            # Timeout - retry with longer timeout
-            if retry_count < self.max_retries:
-                new_timeout = timeout + 5
-                print(f"  ⚠ Timeout: Retrying with {new_timeout}s timeout... (attempt {retry_count + 1}/{self.max_retries})")
-                time.sleep(1)
-                return self.fetch_with_retry(url, new_timeout, retry_count + 1)
-            else:
-                print(f"  ✗ Timeout: Max retries reached")
-                return None
+        return None
+    
+    def read_body(self, response: requests.Response) -> Optional[bytes]:
+        """
+        Read a streamed response body, giving up once it passes max_bytes.
         
-        except requests.exceptions.ConnectionError:
-            # Connection error - retry with backoff
-            if retry_count < self.max_retries:
-                backoff = self.retry_delay_base ** retry_count
-                print(f"  ⚠ Connection Error: Retrying in {backoff}s... (attempt {retry_count + 1}/{self.max_retries})")
-                time.sleep(backoff)
-                return self.fetch_with_retry(url, timeout, retry_count + 1)
-            else:
-                print(f"  ✗ Connection Error: Max retries reached")
+        Args:
+            response: Response fetched with stream=True
+            
+        Returns:
+            Decoded body bytes, or None if the body is too large
+        """
+        # Content-Length is the compressed size, so over the cap means
+        # the decoded body is too
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response.close()
+            log.info("  ✗ Too large (%s bytes): Skipping %s", content_length, response.url)
+            return None
+        
+        # Keep the chunks as they come off the socket and join once at the
+        # end: a single copy into the buffer the parser reads, instead of
+        # growing a bytearray and then copying it again into bytes
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_bytes:
+                response.close()
+                log.info("  ✗ Too large (over %d bytes): Skipping %s", self.max_bytes, response.url)
                 return None
         
-        except requests.exceptions.RequestException as e:
-            print(f"  ✗ Error: {e}")
-            return None
+        return b''.join(chunks)
     
     def get_links(self, url: str, base_domain: str) -> List[str]:
         """
@@ -230,26 +707,78 @@ class WebCrawler:
         Returns:
             List of valid URLs found on the page
         """
+        # Don't download and parse binaries hiding behind odd extensions
+        if not self.is_html_url(url):
+            log.info("  ✗ Not HTML: Skipping %s", url)
+            return []
+        
         response = self.fetch_with_retry(url)
         
         if response is None:
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links = []
+        # Extensionless URLs skip the HEAD probe; check what the GET actually
+        # returned before reading a binary body off the socket
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' not in content_type:
+            response.close()
+            log.info("  ✗ Not HTML (%s): Skipping %s", content_type or 'no content type', url)
+            return []
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute_url = urljoin(url, href)
-            
-            # Remove fragments
-            absolute_url = absolute_url.split('#')[0]
+        body = self.read_body(response)
+        if body is None:
+            return []
+        
+        # selectolax is a C parser; hand it the raw bytes so the body is
+        # never decoded into a Python str
+        tree = HTMLParser(body)
+        
+        # Remove fragments up front and collapse repeated hrefs (nav bars,
+        # pagination) so each distinct href is resolved and validated once.
+        # A dict keeps the page order; in-page anchors ("#top") drop out here.
+        # tags('a') walks the tree directly rather than going through the CSS
+        # selector engine, and attrs looks up href without copying every
+        # attribute of the anchor into a dict
+        hrefs = {}
+        for node in tree.tags('a'):
+            href = node.attrs.get('href')
+            if href:
+                href = href.partition('#')[0]
+                # mailto:/javascript: links would only be rejected by
+                # is_valid_url after a pointless urljoin and canonicalize
+                if href and not href[:11].lower().startswith(_SKIP_SCHEMES):
+                    hrefs[href] = None
+        
+        # Relative links resolve against the URL the page was actually served
+        # from (after redirects), or against its <base href> if it has one
+        base_url = response.url or url
+        base = tree.css_first('base[href]')
+        if base is not None:
+            base_url = urljoin(base_url, base.attrs.get('href'))
+        
+        # Most hrefs are absolute or root-relative; those only need a string
+        # concat, so urljoin is left for relative paths and anything with dot
+        # segments ("/a/../b") that have to be resolved
+        parsed = _parse(base_url)
+        scheme_host = f"{parsed.scheme}://{parsed.netloc}"
+        
+        links = {}  # Canonicalizing can fold two hrefs into one URL; keep it once
+        for href in hrefs:
+            if '/.' in href:
+                absolute_url = urljoin(base_url, href)
+            elif href[:1] == '/' and href[:2] != '//':
+                absolute_url = scheme_host + href
+            elif href[:7] == 'http://' or href[:8] == 'https://':
+                absolute_url = href
+            else:
+                absolute_url = urljoin(base_url, href)
+            absolute_url = canonicalize_url(absolute_url)
             
             # is_valid_url now handles domain check AND file filtering
             if self.is_valid_url(absolute_url, base_domain):
-                links.append(absolute_url)
+                links[absolute_url] = None
         
-        return links
+        return list(links)
     
     def _crawl_url(self, url: str, base_domain: str) -> tuple[str, List[str]]:
         """
@@ -262,10 +791,154 @@ class WebCrawler:
         Returns:
             Tuple of (url, list of links found)
         """
-        print(f"Crawling: {url}")
+        log.info("Crawling: %s", url)
         links = self.get_links(url, base_domain)
         return (url, links)
     
+    def _frontier_path(self) -> str:
+        """Path of the frontier snapshot that goes with state_path."""
+        return self.state_path + '.frontier'
+    
+    def _record_visit(self, url: str) -> None:
+        """Mark a URL visited, appending it to the state log if there is one."""
+        self.visited_urls.add(url)
+        if self._state_log is not None:
+            self._state_log.write(json.dumps({'visited': url}) + '\n')
+    
+    def save_state(self, to_visit: deque) -> None:
+        """
+        Checkpoint the crawl: flush the state log to disk and snapshot the
+        frontier. Visits are appended to the log as they happen, so a
+        checkpoint writes only the frontier, not everything seen so far.
+        The snapshot is written beside the old one and swapped in with
+        os.replace, so a crash mid-write leaves the last one intact.
+        Must only be called from the crawl loop, while no worker is running.
+        
+        Args:
+            to_visit: Frontier queue to save
+        """
+        self._merge_staged_files()
+        self._state_log.flush()
+        os.fsync(self._state_log.fileno())
+        
+        frontier_path = self._frontier_path()
+        tmp_path = frontier_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(url) + '\n' for url in to_visit)
+        os.replace(tmp_path, frontier_path)
+        self._checkpointed = len(self.visited_urls)
+        log.info("Checkpointed %d visited, %d queued to %s",
+                 len(self.visited_urls), len(to_visit), self.state_path)
+    
+    def load_state(self, start_url: str) -> Optional[deque]:
+        """
+        Restore the state of an interrupted crawl of start_url, if there is
+        one. A state file from a crawl of another start URL is ignored.
+        
+        Args:
+            start_url: Canonical start URL of the crawl about to run
+            
+        Returns:
+            The saved frontier queue, or None if there is nothing to resume
+        """
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        
+        header = None
+        visited: Set[str] = set()
+        files: Set[str] = set()
+        with open(self.state_path, 'rb+') as f:
+            good = 0  # Offset just past the last complete record
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                # A crash mid-write leaves a torn last line; cut it off so
+                # the records appended on resume start on a line of their own
+                if record is None or not line.endswith(b'\n'):
+                    f.truncate(good)
+                    break
+                good += len(line)
+                
+                if header is None:
+                    header = record
+                elif 'visited' in record:
+                    visited.add(record['visited'])
+                elif 'file' in record:
+                    files.add(record['file'])
+        
+        if header is None or header.get('start_url') != start_url:
+            log.warning("Ignoring %s: it is not a crawl of %s", self.state_path, start_url)
+            return None
+        
+        to_visit = deque()
+        if os.path.exists(self._frontier_path()):
+            with open(self._frontier_path(), encoding='utf-8') as f:
+                to_visit.extend(url for url in map(json.loads, f) if url not in visited)
+        elif start_url not in visited:
+            to_visit.append(start_url)
+        
+        self.visited_urls = visited
+        self.files_found = files
+        for url in visited:
+            self.enqueued_urls.add(url)
+        for url in to_visit:
+            self.enqueued_urls.add(url)
+        self._checkpointed = len(visited)
+        return to_visit
+    
+    def _clear_state(self) -> None:
+        """Remove the state log and frontier snapshot of a finished crawl."""
+        for path in (self.state_path, self._frontier_path()):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _maybe_checkpoint(self, to_visit: deque) -> None:
+        """Save the crawl state once checkpoint_every new pages were visited."""
+        if self.state_path and len(self.visited_urls) - self._checkpointed >= self.checkpoint_every:
+            self.save_state(to_visit)
+    
+    def _enqueue_links(self, links: List[str], to_visit: deque) -> None:
+        """
+        Append links that were never enqueued before to the frontier, up
+        to the number of pages max_pages still leaves room for.
+        
+        Args:
+            links: Distinct links found on a page, in page order
+            to_visit: Frontier queue to append to
+        """
+        # Queued links have passed can_fetch, so each one becomes a visit;
+        # anything past max_pages would only sit in memory (and in every
+        # checkpoint) unused. Links left out aren't marked enqueued, so a
+        # later page can still offer them if room opens up
+        room = self.max_pages - len(self.visited_urls) - len(to_visit)
+        if room <= 0:
+            return
+        
+        if isinstance(self.enqueued_urls, BloomFilter):
+            for link in links:
+                if room <= 0:
+                    break
+                if link not in self.enqueued_urls and self.can_fetch(link):
+                    self.enqueued_urls.add(link)
+                    to_visit.append(link)
+                    room -= 1
+            return
+        
+        # Set difference runs in C, one pass, instead of a membership test
+        # per link in Python
+        new = set(links)
+        new -= self.enqueued_urls
+        if new:
+            # Filter the original list rather than extending with the set,
+            # so the crawl order stays the page order and is reproducible.
+            # islice stops the robots.txt checks once the room is filled
+            accepted = list(islice(
+                (link for link in links if link in new and self.can_fetch(link)), room))
+            self.enqueued_urls.update(accepted)
+            to_visit.extend(accepted)
+    
     def crawl(self, start_url: str) -> Set[str]:
         """
         Crawl website starting from the given URL.
@@ -277,46 +950,90 @@ class WebCrawler:
         Returns:
             Set of all visited URLs
         """
+        start_url = canonicalize_url(start_url)
         base_domain = urlparse(start_url).netloc
-        to_visit = deque([start_url])
+        
+        to_visit = self.load_state(start_url)
+        resumed = to_visit is not None
+        if resumed:
+            log.info("Resuming from %s: %d visited, %d queued",
+                     self.state_path, len(self.visited_urls), len(to_visit))
+        else:
+            to_visit = deque([start_url])
+            self.enqueued_urls.add(start_url)
         
         mode = "parallel" if self.max_workers > 1 else "single-threaded"
-        print(f"Starting {mode} crawl from: {start_url}")
-        print(f"Base domain: {base_domain}")
-        print(f"Max pages: {self.max_pages}")
+        log.info("Starting %s crawl from: %s", mode, start_url)
+        log.info("Base domain: %s", base_domain)
+        log.info("Max pages: %d", self.max_pages)
         if self.max_workers > 1:
-            print(f"Workers: {self.max_workers}")
+            log.info("Workers: %d", self.max_workers)
         
         # Load robots.txt
         self.load_robots_txt(start_url)
-        print()
         
+        if self.state_path:
+            # Line-buffered, so every visit reaches the file as it happens
+            self._state_log = open(self.state_path, 'a' if resumed else 'w',
+                                   encoding='utf-8', buffering=1)
+            if not resumed:
+                self._state_log.write(json.dumps({'start_url': start_url}) + '\n')
+                self.save_state(to_visit)
+        
+        try:
+            self._crawl_frontier(base_domain, to_visit)
+        except BaseException:
+            # Interrupted (Ctrl-C or an error): snapshot the frontier so the
+            # next run picks up from here
+            if self._state_log is not None:
+                self.save_state(to_visit)
+            raise
+        finally:
+            self._merge_staged_files()
+            if self._state_log is not None:
+                self._state_log.close()
+                self._state_log = None
+        
+        # Finished: a leftover state file would only turn the next crawl of
+        # this site into a no-op
+        if self.state_path:
+            self._clear_state()
+        
+        log.info("Crawling complete! Visited %d pages.", len(self.visited_urls))
+        if self.files_found:
+            log.info("Found %d non-HTML files (not crawled)", len(self.files_found))
+        return self.visited_urls
+    
+    def _crawl_frontier(self, base_domain: str, to_visit: deque) -> None:
+        """
+        Visit pages from the frontier until it runs dry or max_pages is hit.
+        Requests are paced per host by wait_for_host, which worker threads
+        share, so the delay holds however many workers there are.
+        
+        Args:
+            base_domain: Base domain for filtering
+            to_visit: Frontier queue
+        """
         if self.max_workers == 1:
             # Single-threaded crawl (original behavior)
             while to_visit and len(self.visited_urls) < self.max_pages:
+                # enqueued_urls admits each URL once, so anything popped
+                # here has not been visited; no visited_urls lookup needed
                 url = to_visit.popleft()
                 
-                if url in self.visited_urls:
-                    continue
-                
                 if not self.can_fetch(url):
-                    print(f"Skipping (disallowed by robots.txt): {url}")
+                    log.info("Skipping (disallowed by robots.txt): %s", url)
                     continue
                 
-                print(f"Crawling [{len(self.visited_urls) + 1}/{self.max_pages}]: {url}")
-                self.visited_urls.add(url)
+                log.info("Crawling [%d/%d]: %s", len(self.visited_urls) + 1, self.max_pages, url)
+                self._record_visit(url)
                 
+                # Pacing happens per request, inside the HEAD probe and
+                # fetch_with_retry
                 links = self.get_links(url, base_domain)
-                
-                for link in links:
-                    if link not in self.visited_urls and link not in to_visit:
-                        to_visit.append(link)
-                
-                time.sleep(self.delay)
+                self._enqueue_links(links, to_visit)
+                self._maybe_checkpoint(to_visit)
         else:
-            # no need for a rate-limiter, because number of threads are 
-            # limited by thread count (max_workers)
-
             # Multi-threaded crawl using ThreadPoolExecutor
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 while to_visit and len(self.visited_urls) < self.max_pages:
@@ -329,12 +1046,16 @@ class WebCrawler:
                         if to_visit:
                             url = to_visit.popleft()
                             
-                            if url not in self.visited_urls and self.can_fetch(url):
-                                self.visited_urls.add(url)
+                            if self.can_fetch(url):
+                                self._record_visit(url)
                                 batch.append(url)
+                            else:
+                                log.info("Skipping (disallowed by robots.txt): %s", url)
                     
+                    # A batch robots.txt emptied entirely doesn't mean the
+                    # frontier is exhausted; the while condition decides that
                     if not batch:
-                        break
+                        continue
                     
                     # Submit batch to thread pool
                     futures = {
@@ -347,21 +1068,13 @@ class WebCrawler:
                         url = futures[future]
                         try:
                             crawled_url, links = future.result()
-                            
-                            for link in links:
-                                if link not in self.visited_urls and link not in to_visit:
-                                    to_visit.append(link)
+                            self._enqueue_links(links, to_visit)
                         
                         except Exception as e:
-                            print(f"Error crawling {url}: {e}")
+                            log.error("Error crawling %s: %s", url, e)
                     
-                    # Rate limiting between batches
-                    time.sleep(self.delay)
-        
-        print(f"\nCrawling complete! Visited {len(self.visited_urls)} pages.")
-        if self.files_found:
-            print(f"Found {len(self.files_found)} non-HTML files (not crawled)")
-        return self.visited_urls
+                    self._merge_staged_files()
+                    self._maybe_checkpoint(to_visit)
 
 
 def main():
@@ -376,9 +1089,24 @@ def main():
     # Choose which site to crawl (change index to test different sites)
     start_url = test_sites[0]
     
+    # Worker threads only enqueue log records; the listener's background
+    # thread does the formatting and stderr writes. Raise the level to
+    # WARNING to hide per-page progress
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    
+    # Resolve each host once instead of once per new connection
+    enable_dns_cache()
+    
     # max_workers=1 for single-threaded, 5 for parallel crawling
-    crawler = WebCrawler(max_pages=20, delay=1.0, max_workers=5)
-    visited_urls = crawler.crawl(start_url)
+    try:
+        with WebCrawler(max_pages=20, delay=1.0, max_workers=5) as crawler:
+            visited_urls = crawler.crawl(start_url)
+    finally:
+        listener.stop()
     
     # Print results
     print("\n" + "="*50)
@@ -1,13 +1,82 @@
 #!/usr/bin/env python3
 import asyncio
 import httpx
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from selectolax.parser import HTMLParser
+from urllib.parse import urljoin, urlparse, urlsplit
 from urllib.robotparser import RobotFileParser
-from typing import Set, List, Optional
+from typing import Dict, Set, List, Optional
 from collections import deque
+from functools import lru_cache
+import hashlib
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import time
 import random
+import re
+from rate_limiter import TokenBucketRateLimiter
+
+try:
+    import uvloop
+except ImportError:  # Fall back to the stdlib event loop
+    uvloop = None
+
+try:
+    import h2  # httpx's HTTP/2 support (httpx[http2])
+except ImportError:  # Stay on HTTP/1.1
+    h2 = None
+
+
+log = logging.getLogger(__name__)
+
+
+# Non-HTML file extensions that are recorded but never crawled: one
+# case-insensitive search instead of lowercasing every URL and trying each
+# suffix in turn. The extension may be followed by a query or fragment
+_SKIP_EXTENSION_RE = re.compile(
+    r'\.(?:pdf|jpe?g|png|gif|svg|ico'
+    r'|zip|tar|gz|rar|7z'
+    r'|mp[34]|avi|mov|wmv'
+    r'|docx?|xlsx?|pptx?'
+    r'|xml|json|csv|txt'
+    r'|css|js|woff2?|ttf|eot)(?:[?#]|$)',
+    re.IGNORECASE,
+)
+
+
+def _url_key(url: str) -> bytes:
+    """
+    16-byte digest standing in for a URL in membership-only sets: a
+    fraction of the str's size, and collisions are out of reach for any
+    crawl this side of 1e18 URLs.
+    """
+    return hashlib.blake2b(url.encode(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=65536)
+def _classify_url(url: str, base_domain: str) -> Optional[bool]:
+    """
+    Cached core of AsyncWebCrawler.is_valid_url. The same nav and
+    pagination links turn up on every page, so most calls are repeats.
+    
+    Returns:
+        True for a same-domain page, False for another domain,
+        None for a same-domain non-HTML file
+    """
+    # urlsplit skips the ;params parsing urlparse does. hostname drops any
+    # user info and port and is lowercased, so "EXAMPLE.com:443" and
+    # "example.com" compare equal; base_domain is normalized the same way
+    host = urlsplit(url).hostname
+    
+    # Must have a domain and match base domain
+    if not host or host != base_domain:
+        return False
+    
+    # Skip non-HTML files
+    if _SKIP_EXTENSION_RE.search(url):
+        return None
+    
+    return True
 
 
 class AsyncWebCrawler:
@@ -17,7 +86,7 @@ class AsyncWebCrawler:
         
         Args:
             max_pages: Maximum number of pages to crawl
-            delay: Delay between batches in seconds
+            delay: Time window in which at most max_concurrent requests are sent, in seconds
             max_concurrent: Maximum number of concurrent requests
         """
         self.max_pages = max_pages
@@ -25,40 +94,88 @@ class AsyncWebCrawler:
         self.max_concurrent = max_concurrent
         self.visited_urls: Set[str] = set()
         self.files_found: Set[str] = set()  # Track non-HTML files
-        self.user_agents = [
+        self.user_agents = (
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
-        ]
+        )
         self.current_user_agent = self.user_agents[0]
         self.robot_parser = RobotFileParser()
+        # can_fetch answers keyed by (user agent, path, query), the only
+        # parts of a URL robots.txt rules look at
+        self._can_fetch_cache: Dict[tuple, bool] = {}
         self.max_retries = 3
         self.retry_delay_base = 2  # Base delay for exponential backoff
+        self.max_bytes = 5 * 1024 * 1024  # Skip pages larger than 5 MB
         self.semaphore = asyncio.Semaphore(max_concurrent)  # Limit concurrent requests
+        # One token bucket per host: each host gets the same ceiling as one
+        # request per worker per `delay`, while different hosts never wait
+        # on each other's budget
+        self._limiters: Dict[str, TokenBucketRateLimiter] = {}
     
-    def rotate_user_agent(self) -> None:
-        """Rotate to a different user agent."""
-        self.current_user_agent = random.choice(self.user_agents)
-        print(f"  ↻ Rotated user agent")
+    def _limiter(self, host: str) -> TokenBucketRateLimiter:
+        """Get (or create) the rate limiter for a host."""
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = TokenBucketRateLimiter(
+                max_requests=self.max_concurrent, time_window=self.delay)
+        return limiter
+    
+    def rotate_user_agent(self) -> Dict[str, str]:
+        """
+        Pick a different user agent for a single request.
+        The client's default headers are left alone, so a rotation in one
+        task never changes requests other tasks have in flight.
+        
+        Returns:
+            Per-request headers carrying the new User-Agent
+        """
+        others = [ua for ua in self.user_agents if ua != self.current_user_agent]
+        user_agent = random.choice(others) if others else self.current_user_agent
+        log.debug("  ↻ Rotated user agent")
+        return {'User-Agent': user_agent}
     
-    async def load_robots_txt(self, base_url: str) -> None:
+    async def load_robots_txt(self, client: httpx.AsyncClient, base_url: str) -> None:
         """
         Load and parse the robots.txt file for the domain.
+        Fetched with the crawl's own client rather than
+        RobotFileParser.read(), whose blocking urlopen would stall the
+        event loop for the whole round trip.
         
         Args:
+            client: httpx AsyncClient instance
             base_url: Base URL of the website
         """
         parsed = urlparse(base_url)
         robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        self.robot_parser.set_url(robots_url)
+        self._can_fetch_cache.clear()
         
         try:
-            # RobotFileParser.read() is synchronous, so we use it directly
-            self.robot_parser.set_url(robots_url)
-            self.robot_parser.read()
-            print(f"Loaded robots.txt from: {robots_url}")
-        except Exception as e:
-            print(f"Could not load robots.txt: {e}")
-            print("Proceeding without robots.txt restrictions")
+            response = await client.get(robots_url)
+        except httpx.HTTPError as e:
+            response = None
+            error = e
+        
+        # 401/403 and server errors disallow everything (RFC 9309: a 5xx
+        # robots.txt means complete disallow), any other 4xx means the site
+        # has no robots.txt
+        if response is not None and (response.status_code in (401, 403)
+                                     or response.status_code >= 500):
+            self.robot_parser.disallow_all = True
+            log.warning("robots.txt is %d: nothing may be crawled", response.status_code)
+        elif response is not None and response.status_code >= 400:
+            self.robot_parser.allow_all = True
+            log.info("No robots.txt at: %s", robots_url)
+        elif response is not None:
+            self.robot_parser.parse(response.text.splitlines())
+            log.info("Loaded robots.txt from: %s", robots_url)
+        else:
+            # Unreachable. Allow everything explicitly: an unparsed
+            # RobotFileParser answers False to every can_fetch
+            self.robot_parser.allow_all = True
+            log.warning("Could not load robots.txt: %s", error)
+            log.warning("Proceeding without robots.txt restrictions")
     
     def is_valid_url(self, url: str, base_domain: str) -> bool:
         """
@@ -72,25 +189,12 @@ class AsyncWebCrawler:
         Returns:
             True if URL is valid, on same domain, and is an HTML page
         """
-        parsed = urlparse(url)
-        
-        # Must have a domain and match base domain
-        if not (bool(parsed.netloc) and parsed.netloc == base_domain):
-            return False
-        
-        # Skip non-HTML files
-        skip_extensions = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico',
-                          '.zip', '.tar', '.gz', '.rar', '.7z',
-                          '.mp3', '.mp4', '.avi', '.mov', '.wmv',
-                          '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-                          '.xml', '.json', '.csv', '.txt',
-                          '.css', '.js', '.woff', '.woff2', '.ttf', '.eot')
-        
-        if url.lower().endswith(skip_extensions):
+        verdict = _classify_url(url, base_domain)
+        if verdict is None:
+            # Recorded here, outside the cache, so every crawler sees its files
             self.files_found.add(url)
             return False
-        
-        return True
+        return verdict
     
     def can_fetch(self, url: str) -> bool:
         """
@@ -102,26 +206,84 @@ class AsyncWebCrawler:
         Returns:
             True if URL can be fetched
         """
-        return self.robot_parser.can_fetch(self.current_user_agent, url)
+        # RobotFileParser re-parses the URL and walks every rule per call
+        parts = urlsplit(url)
+        key = (self.current_user_agent, parts.path, parts.query)
+        allowed = self._can_fetch_cache.get(key)
+        if allowed is None:
+            allowed = self._can_fetch_cache[key] = self.robot_parser.can_fetch(
+                self.current_user_agent, url)
+        return allowed
     
     async def fetch_with_retry(self, client: httpx.AsyncClient, url: str, 
-                               timeout: int = 10, retry_count: int = 0) -> Optional[httpx.Response]:
+                               timeout: Optional[float] = None) -> Optional[httpx.Response]:
         """
         Fetch URL with retry logic and exponential backoff.
         
         Args:
             client: httpx AsyncClient instance
             url: URL to fetch
-            timeout: Request timeout in seconds
-            retry_count: Current retry attempt
+            timeout: Read timeout in seconds (None = the client's); the
+                client's connect, write and pool timeouts always apply
             
         Returns:
-            Response object if successful, None otherwise
+            Streamed response if successful (body not read yet; the caller
+            closes it), None otherwise
         """
-        try:
-            # Semaphore ensures we don't exceed max_concurrent requests
-            async with self.semaphore:
-                response = await client.get(url, timeout=timeout)
+        # Retries loop here rather than recursing: one coroutine per URL, and
+        # the semaphore is only held around each request, never across a
+        # backoff sleep
+        headers = None  # Per-request overrides, set after a 401/403
+        for retry_count in range(self.max_retries + 1):
+            retries_left = retry_count < self.max_retries
+            try:
+                if self.delay > 0:
+                    await self._limiter(urlsplit(url).hostname).acquire()
+                
+                # Semaphore ensures we don't exceed max_concurrent requests
+                # Streamed, so the caller can look at the headers before
+                # deciding to download the body at all
+                if timeout is None:
+                    request = client.build_request('GET', url, headers=headers)
+                else:
+                    # Only the read timeout grows on retry; a plain
+                    # Timeout(n) would also replace the short connect
+                    # timeout and the unbounded pool wait
+                    request = client.build_request('GET', url, headers=headers, timeout=httpx.Timeout(
+                        connect=client.timeout.connect, read=timeout,
+                        write=client.timeout.write, pool=client.timeout.pool))
+                async with self.semaphore:
+                    response = await client.send(request, stream=True)
+            
+            except httpx.TimeoutException:
+                # Timeout - retry with longer timeout
+                if not retries_left:
+                    log.warning("  ✗ Timeout: Max retries reached: %s", url)
+                    return None
+                timeout = (timeout if timeout is not None else client.timeout.read) + 5
+                log.warning("  ⚠ Timeout: Retrying with %ss timeout... (attempt %d/%d)",
+                            timeout, retry_count + 1, self.max_retries)
+                await asyncio.sleep(1)
+                continue
+            
+            except httpx.ConnectError:
+                # Connection error - retry with backoff
+                if not retries_left:
+                    log.warning("  ✗ Connection Error: Max retries reached: %s", url)
+                    return None
+                backoff = self.retry_delay_base ** retry_count
+                log.warning("  ⚠ Connection Error: Retrying in %ss... (attempt %d/%d)",
+                            backoff, retry_count + 1, self.max_retries)
+                await asyncio.sleep(backoff)
+                continue
+            
+            except httpx.HTTPError as e:
+                log.warning("  ✗ Error: %s", e)
+                return None
+            
+            if response.status_code not in (200, 301, 302):
+                # Nothing below reads an error page; hand the connection back
+                await response.aclose()
             
             # 200: Success
             if response.status_code == 200:
@@ -129,76 +291,82 @@ class AsyncWebCrawler:
             
             # 301/302: Redirect (httpx follows automatically)
             elif response.status_code in [301, 302]:
-                print(f"  → Redirected to: {response.url}")
+                log.info("  → Redirected to: %s", response.url)
                 return response
             
             # 404: Page not found - skip, log, don't retry
             elif response.status_code == 404:
-                print(f"  ✗ Not Found (404): Skipping")
+                log.info("  ✗ Not Found (404): Skipping %s", url)
                 return None
             
             # 403/401: Forbidden/Unauthorized - rotate user agent and retry
             elif response.status_code in [403, 401]:
-                if retry_count < self.max_retries:
-                    print(f"  ⚠ {response.status_code}: Rotating user agent and retrying...")
-                    self.rotate_user_agent()
-                    await asyncio.sleep(1)
-                    return await self.fetch_with_retry(client, url, timeout, retry_count + 1)
-                else:
-                    print(f"  ✗ {response.status_code}: Max retries reached")
+                if not retries_left:
+                    log.warning("  ✗ %d: Max retries reached: %s", response.status_code, url)
                     return None
+                log.warning("  ⚠ %d: Rotating user agent and retrying...", response.status_code)
+                headers = self.rotate_user_agent()
+                await asyncio.sleep(1)
             
             # 429: Too Many Requests - exponential backoff with jitter
             elif response.status_code == 429:
-                if retry_count < self.max_retries:
-                    backoff = (self.retry_delay_base ** retry_count) + random.uniform(0, 1)
-                    print(f"  ⚠ 429: Rate limited, backing off for {backoff:.1f}s...")
-                    await asyncio.sleep(backoff)
-                    return await self.fetch_with_retry(client, url, timeout, retry_count + 1)
-                else:
-                    print(f"  ✗ 429: Max retries reached")
+                if not retries_left:
+                    log.warning("  ✗ 429: Max retries reached: %s", url)
                     return None
+                backoff = min(60, self.retry_delay_base ** retry_count) + random.uniform(0, 1)
+                log.warning("  ⚠ 429: Rate limited, backing off for %.1fs...", backoff)
+                await asyncio.sleep(backoff)
             
             # 500/503: Server errors - retry with backoff (up to 3x)
             elif response.status_code in [500, 503]:
-                if retry_count < self.max_retries:
-                    backoff = self.retry_delay_base ** retry_count
-                    print(f"  ⚠ {response.status_code}: Server error, retrying in {backoff}s... (attempt {retry_count + 1}/{self.max_retries})")
-                    await asyncio.sleep(backoff)
-                    return await self.fetch_with_retry(client, url, timeout, retry_count + 1)
-                else:
-                    print(f"  ✗ {response.status_code}: Max retries reached")
+                if not retries_left:
+                    log.warning("  ✗ %d: Max retries reached: %s", response.status_code, url)
                     return None
+                backoff = self.retry_delay_base ** retry_count
+                log.warning("  ⚠ %d: Server error, retrying in %ss... (attempt %d/%d)",
+                            response.status_code, backoff, retry_count + 1, self.max_retries)
+                await asyncio.sleep(backoff)
             
             else:
-                print(f"  ? Unexpected status code: {response.status_code}")
+                log.info("  ? Unexpected status code: %d", response.status_code)
                 return None
         
-        except httpx.TimeoutException:
-            # Timeout - retry with longer timeout
-            if retry_count < self.max_retries:
-                new_timeout = timeout + 5
-                print(f"  ⚠ Timeout: Retrying with {new_timeout}s timeout... (attempt {retry_count + 1}/{self.max_retries})")
-                await asyncio.sleep(1)
-                return await self.fetch_with_retry(client, url, new_timeout, retry_count + 1)
-            else:
-                print(f"  ✗ Timeout: Max retries reached")
-                return None
+        return None
+    
+    async def read_body(self, response: httpx.Response) -> Optional[bytes]:
+        """
+        Read a streamed response body, giving up once it passes max_bytes.
         
-        except httpx.ConnectError:
-            # Connection error - retry with backoff
-            if retry_count < self.max_retries:
-                backoff = self.retry_delay_base ** retry_count
-                print(f"  ⚠ Connection Error: Retrying in {backoff}s... (attempt {retry_count + 1}/{self.max_retries})")
-                await asyncio.sleep(backoff)
-                return await self.fetch_with_retry(client, url, timeout, retry_count + 1)
-            else:
-                print(f"  ✗ Connection Error: Max retries reached")
-                return None
+        Args:
+            response: Response returned by fetch_with_retry
+            
+        Returns:
+            Decoded body bytes, or None if the body is too large or the
+            connection fails mid-read
+        """
+        # Content-Length is the compressed size, so over the cap means
+        # the decoded body is too
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            log.info("  ✗ Too large (%s bytes): Skipping %s", content_length, response.url)
+            return None
         
+        # Collect the chunks and join once at the end, rather than growing
+        # a bytes object chunk by chunk
+        chunks = []
+        size = 0
+        try:
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_bytes:
+                    log.info("  ✗ Too large (over %d bytes): Skipping %s", self.max_bytes, response.url)
+                    return None
         except httpx.HTTPError as e:
-            print(f"  ✗ Error: {e}")
+            log.warning("  ✗ Error reading body: %s", e)
             return None
+        
+        return b''.join(chunks)
     
     async def get_links(self, client: httpx.AsyncClient, url: str, base_domain: str) -> List[str]:
         """
@@ -217,21 +385,60 @@ class AsyncWebCrawler:
         if response is None:
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links = []
+        try:
+            # Don't download binaries that got past the extension filter
+            content_type = response.headers.get('content-type', '')
+            if 'html' not in content_type:
+                log.info("  ✗ Not HTML (%s): Skipping %s", content_type or 'no content type', url)
+                return []
+            body = await self.read_body(response)
+        finally:
+            await response.aclose()
+        
+        if body is None:
+            return []
+        
+        # selectolax is a C parser; hand it the raw bytes so the body is
+        # never decoded into a Python str
+        tree = HTMLParser(body)
+        
+        # Relative links resolve against the URL the page was actually served
+        # from (after redirects). Split it once here: urljoin would re-parse
+        # it for every anchor
+        base_url = str(response.url)
+        parsed = urlsplit(base_url)
+        scheme_host = f"{parsed.scheme}://{parsed.netloc}"
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute_url = urljoin(url, href)
+        links = {}  # Repeated hrefs (nav bars, pagination) are kept once, in page order
+        
+        # tags('a') walks the tree directly rather than going through the CSS
+        # selector engine, and attrs looks up href without copying every
+        # attribute of the anchor into a dict
+        for node in tree.tags('a'):
+            href = node.attrs.get('href')
+            if not href:
+                continue
+            
+            # Most hrefs are absolute or root-relative; those only need a
+            # string concat, so urljoin is left for relative paths and
+            # anything with dot segments ("/a/../b") that have to be resolved
+            if '/.' in href:
+                absolute_url = urljoin(base_url, href)
+            elif href[:1] == '/' and href[:2] != '//':
+                absolute_url = scheme_host + href
+            elif href[:7] == 'http://' or href[:8] == 'https://':
+                absolute_url = href
+            else:
+                absolute_url = urljoin(base_url, href)
             
             # Remove fragments
-            absolute_url = absolute_url.split('#')[0]
+            absolute_url = absolute_url.partition('#')[0]
             
             # is_valid_url handles domain check AND file filtering
-            if self.is_valid_url(absolute_url, base_domain):
-                links.append(absolute_url)
+            if absolute_url not in links and self.is_valid_url(absolute_url, base_domain):
+                links[absolute_url] = None
         
-        return links
+        return list(links)
     
     async def crawl_url(self, client: httpx.AsyncClient, url: str, base_domain: str) -> List[str]:
         """
@@ -243,11 +450,16 @@ class AsyncWebCrawler:
             base_domain: Base domain for filtering
             
         Returns:
-            List of links found on the page
+            List of links found on the page (empty if crawling it failed)
         """
-        print(f"Crawling: {url}")
-        links = await self.get_links(client, url, base_domain)
-        return links
+        log.info("Crawling: %s", url)
+        # Errors are logged here, as they happen, so crawl() only ever
+        # gets a list back
+        try:
+            return await self.get_links(client, url, base_domain)
+        except Exception as e:
+            log.error("Error crawling %s: %s", url, e)
+            return []
     
     async def crawl(self, start_url: str) -> Set[str]:
         """
@@ -259,61 +471,83 @@ class AsyncWebCrawler:
         Returns:
             Set of all visited URLs
         """
-        base_domain = urlparse(start_url).netloc
+        base_domain = urlsplit(start_url).hostname or ''
         to_visit = deque([start_url])
+        # Everything ever queued, so "already queued?" is a set lookup
+        # rather than a scan of the deque. Only ever tested for membership,
+        # so it holds digests instead of the URLs themselves
+        enqueued = {_url_key(start_url)}
         
-        print(f"Starting async crawl from: {start_url}")
-        print(f"Base domain: {base_domain}")
-        print(f"Max pages: {self.max_pages}")
-        print(f"Max concurrent requests: {self.max_concurrent}")
-        
-        # Load robots.txt
-        await self.load_robots_txt(start_url)
-        print()
+        log.info("Starting async crawl from: %s", start_url)
+        log.info("Base domain: %s", base_domain)
+        log.info("Max pages: %d", self.max_pages)
+        log.info("Max concurrent requests: %d", self.max_concurrent)
         
-        # Create httpx client with custom headers
+        # Create httpx client with custom headers. HTTP/2, when h2 is
+        # installed, multiplexes concurrent same-host requests over one TLS connection.
+        # Idle connections are kept for 30s (httpx default: 5s), longer than
+        # a rate-limited gap between requests, so they aren't re-handshaked.
+        # A dead host fails on connect fast; waiting for a free connection
+        # is left unbounded, since the semaphore already caps the demand
         async with httpx.AsyncClient(
             headers={'User-Agent': self.current_user_agent},
-            follow_redirects=True
+            follow_redirects=True,
+            http2=h2 is not None,
+            limits=httpx.Limits(max_connections=self.max_concurrent,
+                                max_keepalive_connections=self.max_concurrent,
+                                keepalive_expiry=30.0),
+            timeout=httpx.Timeout(10.0, connect=5.0, pool=None)
         ) as client:
             
-            while to_visit and len(self.visited_urls) < self.max_pages:
-                # Prepare batch of URLs to crawl
-                batch = []
-                batch_size = min(self.max_concurrent, len(to_visit), 
-                               self.max_pages - len(self.visited_urls))
-                
-                for _ in range(batch_size):
-                    if to_visit:
-                        url = to_visit.popleft()
-                        
-                        if url not in self.visited_urls and self.can_fetch(url):
-                            self.visited_urls.add(url)
-                            batch.append(url)
+            # Load robots.txt
+            await self.load_robots_txt(client, start_url)
+            
+            # Keep up to max_concurrent fetches in flight; as soon as one
+            # finishes its slot is refilled, so a slow page never holds up
+            # the rest of the crawl the way a gathered batch would
+            in_flight: Set[asyncio.Task] = set()
+            
+            while to_visit or in_flight:
+                while (to_visit and len(in_flight) < self.max_concurrent
+                       and len(self.visited_urls) < self.max_pages):
+                    url = to_visit.popleft()
+                    
+                    # enqueued admits each URL once, so it can't be visited
+                    # yet. Links are robots-checked when queued; this catches
+                    # the start URL
+                    if not self.can_fetch(url):
+                        continue
+                    
+                    self.visited_urls.add(url)
+                    task = asyncio.create_task(self.crawl_url(client, url, base_domain))
+                    in_flight.add(task)
                 
-                if not batch:
+                if not in_flight:
                     break
                 
-                # Crawl batch concurrently
-                tasks = [self.crawl_url(client, url, base_domain) for url in batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
                 
                 # Process results
-                for i, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        print(f"Error crawling {batch[i]}: {result}")
-                    else:
-                        # Add new links to queue
-                        for link in result:
-                            if link not in self.visited_urls and link not in to_visit:
-                                to_visit.append(link)
-                
-                # Rate limiting between batches
-                await asyncio.sleep(self.delay)
+                for task in done:
+                    links = task.result()
+                    
+                    # Add new links to queue, but only as many as can still be
+                    # visited: every queued link passed can_fetch, so each one
+                    # becomes a visit, and anything past max_pages would sit
+                    # in memory unused. Skipped links aren't marked enqueued
+                    room = self.max_pages - len(self.visited_urls) - len(to_visit)
+                    for link in links:
+                        if room <= 0:
+                            break
+                        key = _url_key(link)
+                        if key not in enqueued and self.can_fetch(link):
+                            enqueued.add(key)
+                            to_visit.append(link)
+                            room -= 1
         
-        print(f"\nCrawling complete! Visited {len(self.visited_urls)} pages.")
+        log.info("Crawling complete! Visited %d pages.", len(self.visited_urls))
         if self.files_found:
-            print(f"Found {len(self.files_found)} non-HTML files (not crawled)")
+            log.info("Found %d non-HTML files (not crawled)", len(self.files_found))
         return self.visited_urls
 
 
@@ -329,9 +563,21 @@ async def main():
     # Choose which site to crawl (change index to test different sites)
     start_url = test_sites[0]
     
+    # Fetch tasks only enqueue log records; the listener's background
+    # thread does the formatting and stderr writes. Raise the level to
+    # WARNING to hide per-page progress
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    
     # max_concurrent controls how many requests happen at once
     crawler = AsyncWebCrawler(max_pages=20, delay=1.0, max_concurrent=10)
-    visited_urls = await crawler.crawl(start_url)
+    try:
+        visited_urls = await crawler.crawl(start_url)
+    finally:
+        listener.stop()
     
     # Print results
     print("\n" + "="*50)
@@ -350,4 +596,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop's libuv-based loop dispatches socket events in C
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
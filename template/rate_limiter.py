@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import asyncio
 import time
-from collections import deque
 from typing import Protocol, runtime_checkable, Optional
 
 # Python's Protocol is Duck Typing
@@ -36,6 +35,7 @@ class TokenBucketRateLimiter:
         """
         self.max_requests = max_requests
         self.time_window = time_window
+        self._rate = max_requests / time_window  # Tokens refilled per second
         self.tokens = max_requests
         self.last_update = time.monotonic()
         self.lock = asyncio.Lock()
@@ -46,24 +46,25 @@ class TokenBucketRateLimiter:
         Blocks until a token is available.
         """
         async with self.lock:
-            while True:
-                now = time.monotonic()
-                time_passed = now - self.last_update
-                
-                # Refill tokens based on time passed
-                self.tokens = min(
-                    self.max_requests,
-                    self.tokens + (time_passed * self.max_requests / self.time_window)
-                )
-                self.last_update = now
-                
-                if self.tokens >= 1.0:
-                    self.tokens -= 1.0
-                    return
-                
-                # Wait until next token is available
-                wait_time = (1.0 - self.tokens) * self.time_window / self.max_requests
+            now = time.monotonic()
+            
+            # Refill tokens based on time passed
+            self.tokens = min(
+                self.max_requests,
+                self.tokens + (now - self.last_update) * self._rate
+            )
+            self.last_update = now
+            
+            if self.tokens < 1.0:
+                # Callers are serialized by the lock, so nothing else can
+                # take tokens meanwhile: sleeping for the deficit once is
+                # exactly enough, no need to loop and re-check
+                wait_time = (1.0 - self.tokens) / self._rate
                 await asyncio.sleep(wait_time)
+                self.tokens = 1.0
+                self.last_update = now + wait_time
+            
+            self.tokens -= 1.0
 
 
 class SlidingWindowRateLimiter:
@@ -82,7 +83,10 @@ class SlidingWindowRateLimiter:
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests = deque()
+        # Ring buffer holding the times of the last max_requests requests
+        self._ring = [0.0] * max_requests
+        self._head = 0   # Index of the oldest recorded request
+        self._count = 0  # Number of recorded requests (up to max_requests)
         self.lock = asyncio.Lock()
     
     async def acquire(self):
@@ -91,22 +95,26 @@ class SlidingWindowRateLimiter:
         Blocks until rate limit allows.
         """
         async with self.lock:
-            now = time.monotonic()
-            
-            # Remove old requests outside the time window
-            while self.requests and self.requests[0] <= now - self.time_window:
-                self.requests.popleft()
-            
-            # If at limit, wait until oldest request expires
-            if len(self.requests) >= self.max_requests:
-                wait_time = self.requests[0] + self.time_window - now
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
-                    # Recursively call to handle the request after waiting
-                    return await self.acquire()
-            
-            # Record this request
-            self.requests.append(now)
+            while True:
+                now = time.monotonic()
+                
+                # Not at the limit yet: record this request
+                if self._count < self.max_requests:
+                    self._ring[(self._head + self._count) % self.max_requests] = now
+                    self._count += 1
+                    return
+                
+                # At the limit: the oldest request must leave the window first
+                wait_time = self._ring[self._head] + self.time_window - now
+                if wait_time <= 0:
+                    # Overwrite the oldest slot; the next one becomes oldest
+                    self._ring[self._head] = now
+                    self._head = (self._head + 1) % self.max_requests
+                    return
+                
+                # Loop rather than re-calling acquire(): asyncio.Lock is not
+                # reentrant, so a recursive call would wait on itself forever
+                await asyncio.sleep(wait_time)
 
 
 class LeakyBucketRateLimiter: